@@ -7,14 +7,18 @@ A modern AI agent using LangGraph that connects to Ollama for log analysis
 import os
 import logging
 import asyncio
-import threading
-import time
-from typing import Dict, Any, List, Optional
+import functools
+from dataclasses import dataclass, replace
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 import json
-import requests
+import httpx
+import orjson
+from cachetools import TTLCache
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
 import uvicorn
 
 # LangGraph imports
@@ -32,8 +36,24 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Agent Legacy",
     description="AI Agent for log analysis using LangGraph and Ollama",
-    version="1.0.0"
+    version="1.0.0",
+    # Endpoints return plain dicts; orjson encodes them without the jsonable_encoder pass
+    default_response_class=ORJSONResponse
 )
+# Token streams are left alone: GZipMiddleware doesn't flush per chunk, so it would hold tokens back
+STREAMING_PATHS = frozenset({"/chat/stream"})
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that passes STREAMING_PATHS through uncompressed"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in STREAMING_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Chat answers and log listings run to several KB of text; small replies such as /health stay uncompressed
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Configuration
 OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://ollama-service:11434")
@@ -45,131 +65,174 @@ AGENT_PORT = int(os.environ.get("AGENT_PORT", "8080"))
 MONITORING_ENABLED = os.environ.get("MONITORING_ENABLED", "true").lower() == "true"
 MONITORING_INTERVAL = int(os.environ.get("MONITORING_INTERVAL", "300"))  # 5 minutes
 ALERT_THRESHOLD = int(os.environ.get("ALERT_THRESHOLD", "10"))  # Alert if >10 errors
+# Namespaces scanned for error logs; a bounded selector keeps Loki from evaluating every stream
+ERROR_NAMESPACES = os.environ.get("ERROR_NAMESPACES", "default|kube-system|monitoring")
+ERROR_QUERY = f'{{namespace=~"{ERROR_NAMESPACES}"}} |~ "(?i)error"'
+# Loki only returns lines containing both "test" and "failed", so replies need no further filtering
+TEST_FAILURE_QUERY = '{namespace="mocks"} |= "test" |= "failed"'
+# Identical Loki queries within this many seconds share one MCP round-trip
+LOKI_CACHE_TTL = float(os.environ.get("LOKI_CACHE_TTL", "30"))
 
-# Initialize Ollama LLM with Gemma 3n:e4b
-llm = Ollama(
-    base_url=OLLAMA_URL,
-    model=MODEL_NAME,
-    temperature=0.7,
-    top_p=0.9,
-    num_ctx=4096,    # Context window for Gemma 3n
-    num_predict=1000 # Prediction limit
+# Shared async client for all Loki MCP calls, so handlers and the monitoring task reuse keep-alive
+# connections without blocking the event loop; failed connects are retried twice
+ASYNC_HTTP = httpx.AsyncClient(
+    headers={"Content-Type": "application/json"},
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    transport=httpx.AsyncHTTPTransport(retries=2)
 )
 
+# Ollama LLM with Gemma 3n:e4b, created on first use and shared afterwards
+@functools.lru_cache(maxsize=1)
+def get_llm() -> Ollama:
+    """Return the shared Ollama LLM"""
+    return Ollama(
+        base_url=OLLAMA_URL,
+        model=MODEL_NAME,
+        temperature=0.7,
+        top_p=0.9,
+        num_ctx=4096,    # Context window for Gemma 3n
+        num_predict=1000 # Prediction limit
+    )
+
+# Recent loki_query results (or the in-flight request) keyed by (query, limit, start, end)
+_query_cache: TTLCache = TTLCache(maxsize=256, ttl=LOKI_CACHE_TTL)
+
+# Pre-encoded loki_query request; only the id and the encoded arguments are filled in per call
+_LOKI_QUERY_TMPL = b'{"jsonrpc":"2.0","id":%d,"method":"tools/call","params":{"name":"loki_query","arguments":%s}}'
+
+# Requests made during the current event loop iteration as (id, encoded arguments, reply future),
+# sent together as one JSON-RPC batch
+_pending_requests: List[Tuple[int, bytes, asyncio.Future]] = []
+# Cleared when the MCP server rejects a batch (4xx, non-JSON, or not one reply per request)
+_batch_supported = True
+# Flushes still running, referenced so they aren't garbage collected mid-request
+_flush_tasks: Set[asyncio.Task] = set()
+
+async def _post_mcp(body: bytes) -> Any:
+    """POST an encoded JSON-RPC request or batch to the Loki MCP server and return the decoded reply"""
+    response = await ASYNC_HTTP.post(f"{LOKI_MCP_URL}/mcp", content=body, timeout=30)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+async def _resolve(req_id: int, arguments: bytes, future: asyncio.Future):
+    """Send a single request and settle its future with the reply"""
+    try:
+        future.set_result(await _post_mcp(_LOKI_QUERY_TMPL % (req_id, arguments)))
+    except Exception as e:
+        future.set_exception(e)
+
+async def _flush_requests():
+    """Send the queued requests, as a single batch POST when there is more than one"""
+    global _pending_requests, _batch_supported
+    batch, _pending_requests = _pending_requests, []
+    
+    if len(batch) > 1 and _batch_supported:
+        # Renumber so replies can be matched back to their request whatever ids the callers used
+        items = b",".join(_LOKI_QUERY_TMPL % (i, arguments) for i, (_, arguments, _) in enumerate(batch))
+        unsupported = False
+        try:
+            replies = await _post_mcp(b"[" + items + b"]")
+        except httpx.HTTPStatusError as e:
+            # A 4xx is the server rejecting the array itself (e.g. a parse error); only 5xx may pass
+            unsupported = e.response.status_code < 500
+            if not unsupported:
+                logger.warning(f"Batched MCP request failed, sending requests individually: {e}")
+        except ValueError:
+            # Reply body was not JSON
+            unsupported = True
+        except Exception as e:
+            logger.warning(f"Batched MCP request failed, sending requests individually: {e}")
+        else:
+            by_id = {reply.get("id"): reply for reply in replies if isinstance(reply, dict)} \
+                if isinstance(replies, list) else {}
+            if len(by_id) == len(batch) and all(i in by_id for i in range(len(batch))):
+                for i, (req_id, _, future) in enumerate(batch):
+                    future.set_result(dict(by_id[i], id=req_id))
+                return
+            unsupported = True
+        if unsupported:
+            logger.warning("Loki MCP server does not support JSON-RPC batches, sending requests individually")
+            _batch_supported = False
+    
+    await asyncio.gather(*(_resolve(req_id, arguments, future) for req_id, arguments, future in batch))
+
+def _submit_request(req_id: int, arguments: bytes) -> asyncio.Future:
+    """Queue a JSON-RPC request for the next batch and return a future for its reply"""
+    future = asyncio.get_running_loop().create_future()
+    if not _pending_requests:
+        # Runs once the tasks already scheduled in this loop iteration, e.g. from one gather, have queued theirs
+        task = asyncio.create_task(_flush_requests())
+        _flush_tasks.add(task)
+        task.add_done_callback(_flush_tasks.discard)
+    _pending_requests.append((req_id, arguments, future))
+    return future
+
+async def _mcp_query(req_id: int, query: str, limit: int, start: str, end: str = "now") -> Dict[str, Any]:
+    """Run loki_query via the MCP server, sharing the reply with identical queries made within LOKI_CACHE_TTL"""
+    key = (query, limit, start, end)
+    task = _query_cache.get(key)
+    if task is None:
+        task = _submit_request(req_id, orjson.dumps({"query": query, "limit": limit, "start": start, "end": end}))
+        _query_cache[key] = task
+    try:
+        # Shielded so a cancelled caller doesn't cancel the request other callers are waiting on
+        return await asyncio.shield(task)
+    except Exception:
+        # Failures are not cached
+        if _query_cache.get(key) is task:
+            del _query_cache[key]
+        raise
+
+async def _loki_query(req_id: int, query: str, limit: int, start: str) -> Optional[List[str]]:
+    """Return the log lines matching query since start, or None if the MCP reply carries no content"""
+    data = await _mcp_query(req_id, query, limit, start)
+    result = data.get("result")
+    if isinstance(result, dict) and "content" in result:
+        return result["content"]
+    return None
+
 # Define tools for the agent
 @tool
-def query_loki_logs(query: str, limit: int = 100) -> str:
+async def query_loki_logs(query: str, limit: int = 100) -> str:
     """Query Loki logs via MCP server for analysis"""
     try:
-        # Query Loki MCP server using the correct MCP protocol
-        response = requests.post(
-            f"{LOKI_MCP_URL}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "tools/call",
-                "params": {
-                    "name": "loki_query",
-                    "arguments": {
-                        "query": query,
-                        "limit": limit,
-                        "start": "1h",  # Last hour
-                        "end": "now"
-                    }
-                }
-            },
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        if "result" in data and "content" in data["result"]:
-            logs = data["result"]["content"]
-            return f"Found {len(logs)} logs matching query '{query}':\n" + "\n".join(logs[:10])
-        else:
+        # Query Loki MCP server for the last hour
+        logs = await _loki_query(1, query, limit, "1h")
+        if logs is None:
             return f"No logs found for query '{query}'"
+        return f"Found {len(logs)} logs matching query '{query}':\n" + "\n".join(logs[:10])
             
     except Exception as e:
         logger.error(f"Error querying Loki MCP: {e}")
         return f"Error querying logs via MCP: {str(e)}"
 
 @tool
-def analyze_test_failures() -> str:
+async def analyze_test_failures() -> str:
     """Analyze test failures from the test infrastructure via MCP"""
     try:
         # Query for test-related logs via MCP
-        test_query = '{namespace="mocks"} |= "test" |= "failed"'
-        response = requests.post(
-            f"{LOKI_MCP_URL}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": 2,
-                "method": "tools/call",
-                "params": {
-                    "name": "loki_query",
-                    "arguments": {
-                        "query": test_query,
-                        "limit": 50,
-                        "start": "1h",
-                        "end": "now"
-                    }
-                }
-            },
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        if "result" in data and "content" in data["result"]:
-            failures = [log for log in data["result"]["content"] if "failed" in log.lower()]
-            
-            if failures:
-                return f"Found {len(failures)} test failures:\n" + "\n".join(failures[:5])
-            else:
-                return "No test failures found in the last hour"
-        else:
+        failures = await _loki_query(2, TEST_FAILURE_QUERY, 50, "1h")
+        if failures is None:
             return "No test data available"
+        if failures:
+            return f"Found {len(failures)} test failures:\n" + "\n".join(failures[:5])
+        return "No test failures found in the last hour"
             
     except Exception as e:
         logger.error(f"Error analyzing test failures via MCP: {e}")
         return f"Error analyzing tests via MCP: {str(e)}"
 
 @tool
-def get_system_health() -> str:
+async def get_system_health() -> str:
     """Get overall system health status via MCP"""
     try:
-        # Query for error logs across all namespaces via MCP
-        error_query = '{namespace=~".+"} |= "ERROR" |= "error"'
-        response = requests.post(
-            f"{LOKI_MCP_URL}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": 3,
-                "method": "tools/call",
-                "params": {
-                    "name": "loki_query",
-                    "arguments": {
-                        "query": error_query,
-                        "limit": 20,
-                        "start": "30m",
-                        "end": "now"
-                    }
-                }
-            },
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        if "result" in data and "content" in data["result"]:
-            errors = data["result"]["content"]
-            
-            if errors:
-                return f"System has {len(errors)} errors in the last 30 minutes:\n" + "\n".join(errors[:3])
-            else:
-                return "System is healthy - no errors found in the last 30 minutes"
-        else:
+        # Query for error logs across the monitored namespaces via MCP
+        errors = await _loki_query(3, ERROR_QUERY, 20, "30m")
+        if errors is None:
             return "Unable to determine system health"
+        if errors:
+            return f"System has {len(errors)} errors in the last 30 minutes:\n" + "\n".join(errors[:3])
+        return "System is healthy - no errors found in the last 30 minutes"
             
     except Exception as e:
         logger.error(f"Error getting system health via MCP: {e}")
@@ -185,56 +248,31 @@ class AgentState:
         self.last_monitoring = None
         self.alerts = []
 
-# Global monitoring state
-monitoring_state = {
-    "last_check": None,
-    "error_count": 0,
-    "alerts": [],
-    "is_monitoring": False
-}
+@dataclass(frozen=True, slots=True)
+class MonitoringSnapshot:
+    """Immutable monitoring state; updates publish a new instance instead of mutating it"""
+    last_check: Optional[str] = None
+    error_count: int = 0
+    alerts: Tuple[Dict[str, Any], ...] = ()
+    is_monitoring: bool = False
+
+# Global monitoring state, replaced as a whole so readers never see a half-applied update
+monitoring_state = MonitoringSnapshot()
 
 # Proactive monitoring functions
-def check_system_health_proactive() -> Dict[str, Any]:
+async def check_system_health_proactive() -> Dict[str, Any]:
     """Proactive system health check"""
     try:
         # Query for errors in the last 5 minutes
-        error_query = '{namespace=~".+"} |= "ERROR" |= "error"'
-        response = requests.post(
-            f"{LOKI_MCP_URL}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": 999,
-                "method": "tools/call",
-                "params": {
-                    "name": "loki_query",
-                    "arguments": {
-                        "query": error_query,
-                        "limit": 100,
-                        "start": "5m",
-                        "end": "now"
-                    }
-                }
-            },
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        if "result" in data and "content" in data["result"]:
-            errors = data["result"]["content"]
-            return {
-                "error_count": len(errors),
-                "errors": errors[:5],  # First 5 errors
-                "timestamp": datetime.now().isoformat(),
-                "status": "healthy" if len(errors) < ALERT_THRESHOLD else "unhealthy"
-            }
-        else:
-            return {
-                "error_count": 0,
-                "errors": [],
-                "timestamp": datetime.now().isoformat(),
-                "status": "unknown"
-            }
+        errors = await _loki_query(999, ERROR_QUERY, 100, "5m")
+        if errors is None:
+            return {"error_count": 0, "errors": [], "timestamp": datetime.now().isoformat(), "status": "unknown"}
+        return {
+            "error_count": len(errors),
+            "errors": errors[:5],  # First 5 errors
+            "timestamp": datetime.now().isoformat(),
+            "status": "healthy" if len(errors) < ALERT_THRESHOLD else "unhealthy"
+        }
             
     except Exception as e:
         logger.error(f"Error in proactive health check: {e}")
@@ -246,47 +284,19 @@ def check_system_health_proactive() -> Dict[str, Any]:
             "error": str(e)
         }
 
-def check_test_failures_proactive() -> Dict[str, Any]:
+async def check_test_failures_proactive() -> Dict[str, Any]:
     """Proactive test failure check"""
     try:
         # Query for test failures in the last 10 minutes
-        test_query = '{namespace="mocks"} |= "test" |= "failed"'
-        response = requests.post(
-            f"{LOKI_MCP_URL}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": 998,
-                "method": "tools/call",
-                "params": {
-                    "name": "loki_query",
-                    "arguments": {
-                        "query": test_query,
-                        "limit": 50,
-                        "start": "10m",
-                        "end": "now"
-                    }
-                }
-            },
-            timeout=30
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        if "result" in data and "content" in data["result"]:
-            failures = [log for log in data["result"]["content"] if "failed" in log.lower()]
-            return {
-                "failure_count": len(failures),
-                "failures": failures[:3],  # First 3 failures
-                "timestamp": datetime.now().isoformat(),
-                "status": "healthy" if len(failures) == 0 else "unhealthy"
-            }
-        else:
-            return {
-                "failure_count": 0,
-                "failures": [],
-                "timestamp": datetime.now().isoformat(),
-                "status": "healthy"
-            }
+        failures = await _loki_query(998, TEST_FAILURE_QUERY, 50, "10m")
+        if failures is None:
+            failures = []
+        return {
+            "failure_count": len(failures),
+            "failures": failures[:3],  # First 3 failures
+            "timestamp": datetime.now().isoformat(),
+            "status": "healthy" if len(failures) == 0 else "unhealthy"
+        }
             
     except Exception as e:
         logger.error(f"Error in proactive test check: {e}")
@@ -298,8 +308,8 @@ def check_test_failures_proactive() -> Dict[str, Any]:
             "error": str(e)
         }
 
-def generate_ai_insights(health_data: Dict[str, Any], test_data: Dict[str, Any]) -> str:
-    """Generate AI insights from monitoring data"""
+async def generate_ai_insights(health_data: Dict[str, Any], test_data: Dict[str, Any]) -> Optional[str]:
+    """Generate AI insights from monitoring data, or None if the LLM call failed"""
     try:
         # Create context for AI analysis
         context = f"""
@@ -317,78 +327,113 @@ def generate_ai_insights(health_data: Dict[str, Any], test_data: Dict[str, Any])
         """
         
         # Get AI analysis
-        response = llm.invoke(context)
+        response = await get_llm().ainvoke(context)
         return response
         
     except Exception as e:
         logger.error(f"Error generating AI insights: {e}")
-        return f"Unable to generate insights: {str(e)}"
+        return None
+
+# Fingerprint of the monitoring data the last AI insights were generated for
+_last_insight_key: Optional[int] = None
 
-def monitoring_worker():
-    """Background monitoring worker"""
-    global monitoring_state
+async def monitoring_loop():
+    """Background monitoring task"""
+    global monitoring_state, _last_insight_key
     
-    while monitoring_state["is_monitoring"]:
+    while monitoring_state.is_monitoring:
         try:
             logger.info("Running proactive monitoring check...")
             
-            # Check system health
-            health_data = check_system_health_proactive()
-            test_data = check_test_failures_proactive()
+            # Check system health; the two queries are independent, so run them concurrently
+            health_data, test_data = await asyncio.gather(
+                check_system_health_proactive(),
+                check_test_failures_proactive()
+            )
             
-            # Update monitoring state
-            monitoring_state["last_check"] = datetime.now().isoformat()
-            monitoring_state["error_count"] = health_data.get("error_count", 0)
+            # One timestamp and one read of each count per tick
+            ts = datetime.now().isoformat()
+            errs = health_data.get("error_count", 0)
+            fails = test_data.get("failure_count", 0)
             
             # Generate alerts if needed
             alerts = []
-            if health_data.get("error_count", 0) >= ALERT_THRESHOLD:
+            if errs >= ALERT_THRESHOLD:
                 alerts.append({
                     "type": "system_health",
                     "severity": "high",
-                    "message": f"High error count: {health_data.get('error_count', 0)} errors",
-                    "timestamp": datetime.now().isoformat()
+                    "message": f"High error count: {errs} errors",
+                    "timestamp": ts
                 })
             
-            if test_data.get("failure_count", 0) > 0:
+            if fails > 0:
                 alerts.append({
                     "type": "test_failures",
                     "severity": "medium",
-                    "message": f"Test failures detected: {test_data.get('failure_count', 0)} failures",
-                    "timestamp": datetime.now().isoformat()
+                    "message": f"Test failures detected: {fails} failures",
+                    "timestamp": ts
                 })
             
-            monitoring_state["alerts"] = alerts
+            # Publish the new monitoring state in one step
+            monitoring_state = replace(monitoring_state, last_check=ts, error_count=errs, alerts=tuple(alerts))
             
-            # Generate AI insights if there are issues
-            if alerts or health_data.get("error_count", 0) > 0 or test_data.get("failure_count", 0) > 0:
-                insights = generate_ai_insights(health_data, test_data)
-                logger.info(f"AI Insights: {insights}")
+            # Generate AI insights if there are issues, unless they are the same ones as last tick
+            if alerts or errs > 0 or fails > 0:
+                insight_key = hash(orjson.dumps([
+                    errs, health_data.get("errors", []), fails, test_data.get("failures", [])
+                ]))
+                if insight_key != _last_insight_key:
+                    insights = await generate_ai_insights(health_data, test_data)
+                    if insights is not None:
+                        # Only a successful analysis is remembered, so a failed one is retried next tick
+                        _last_insight_key = insight_key
+                        logger.info(f"AI Insights: {insights}")
+                else:
+                    logger.info("Monitoring data unchanged since the last insights, skipping AI analysis")
             
-            logger.info(f"Monitoring check completed. Errors: {health_data.get('error_count', 0)}, Test failures: {test_data.get('failure_count', 0)}")
+            logger.info(f"Monitoring check completed. Errors: {errs}, Test failures: {fails}")
             
         except Exception as e:
             logger.error(f"Error in monitoring worker: {e}")
         
         # Wait for next check
-        time.sleep(MONITORING_INTERVAL)
+        await asyncio.sleep(MONITORING_INTERVAL)
+
+# Task running monitoring_loop on the server's event loop
+monitoring_task: Optional[asyncio.Task] = None
 
 def start_monitoring():
-    """Start the monitoring worker"""
-    global monitoring_state
+    """Start the monitoring task"""
+    global monitoring_state, monitoring_task
     
-    if MONITORING_ENABLED and not monitoring_state["is_monitoring"]:
-        monitoring_state["is_monitoring"] = True
-        monitoring_thread = threading.Thread(target=monitoring_worker, daemon=True)
-        monitoring_thread.start()
+    if MONITORING_ENABLED and not monitoring_state.is_monitoring:
+        monitoring_state = replace(monitoring_state, is_monitoring=True)
+        monitoring_task = asyncio.create_task(monitoring_loop())
         logger.info(f"Started proactive monitoring (interval: {MONITORING_INTERVAL}s)")
 
 def stop_monitoring():
-    """Stop the monitoring worker"""
-    global monitoring_state
-    monitoring_state["is_monitoring"] = False
+    """Stop the monitoring task"""
+    global monitoring_state, monitoring_task
+    monitoring_state = replace(monitoring_state, is_monitoring=False)
+    if monitoring_task is not None:
+        monitoring_task.cancel()
+        monitoring_task = None
     logger.info("Stopped proactive monitoring")
 
+def build_agent_prompt(user_request: str, context: Dict[str, Any]) -> str:
+    """Build the LLM prompt for a user request"""
+    return f"""
+        You are an AI agent specialized in log analysis and system monitoring.
+        You have access to Loki logs and can analyze test failures, system health, and more.
+        
+        Current context: {context}
+        Tools available: query_loki_logs, analyze_test_failures, get_system_health
+        
+        User request: {user_request}
+        
+        Provide a helpful response and suggest which tools to use if needed.
+        """
+
 # Define the agent workflow
 def create_agent_graph():
     """Create the LangGraph agent workflow"""
@@ -404,20 +449,10 @@ def create_agent_graph():
             last_message = state.messages[-1]
             
             # Create context for the LLM
-            context = f"""
-            You are an AI agent specialized in log analysis and system monitoring.
-            You have access to Loki logs and can analyze test failures, system health, and more.
-            
-            Current context: {state.context}
-            Tools available: query_loki_logs, analyze_test_failures, get_system_health
-            
-            User request: {last_message.content}
-            
-            Provide a helpful response and suggest which tools to use if needed.
-            """
+            context = build_agent_prompt(last_message.content, state.context)
             
             # Get response from Ollama
-            response = llm.invoke(context)
+            response = get_llm().invoke(context)
             
             return {
                 "messages": [AIMessage(content=response)],
@@ -446,8 +481,30 @@ def create_agent_graph():
     
     return workflow.compile()
 
-# Initialize the agent
-agent = create_agent_graph()
+# The compiled graph holds no per-request state, so one instance serves every request
+@functools.lru_cache(maxsize=1)
+def get_agent():
+    """Return the shared compiled agent graph"""
+    return create_agent_graph()
+
+# Timestamp string cache; callers see the same string until TIMESTAMP_REFRESH seconds of loop time pass
+TIMESTAMP_REFRESH = 0.05
+_TS_CACHE = {"t": 0.0, "s": ""}
+
+def _now_iso() -> str:
+    """Return the current ISO timestamp, reformatted at most once per TIMESTAMP_REFRESH seconds"""
+    t = asyncio.get_running_loop().time()
+    if t - _TS_CACHE["t"] >= TIMESTAMP_REFRESH or not _TS_CACHE["s"]:
+        _TS_CACHE["t"] = t
+        _TS_CACHE["s"] = datetime.now().isoformat()
+    return _TS_CACHE["s"]
+
+# Request bodies; typed models are decoded and validated by pydantic-core instead of building a generic dict
+class ChatRequest(BaseModel):
+    message: str = ""
+
+class AnalyzeRequest(BaseModel):
+    query: str = ""
 
 # FastAPI endpoints
 @app.get("/health")
@@ -456,7 +513,7 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "agent-legacy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _now_iso(),
         "ollama_url": OLLAMA_URL,
         "model_name": MODEL_NAME,
         "loki_mcp_url": LOKI_MCP_URL
@@ -472,10 +529,10 @@ async def metrics():
     }
 
 @app.post("/chat")
-async def chat_endpoint(request: Dict[str, Any]):
+async def chat_endpoint(request: ChatRequest):
     """Main chat endpoint for the agent"""
     try:
-        message = request.get("message", "")
+        message = request.message
         if not message:
             raise HTTPException(status_code=400, detail="Message is required")
         
@@ -484,7 +541,7 @@ async def chat_endpoint(request: Dict[str, Any]):
         state.messages = [HumanMessage(content=message)]
         
         # Run the agent
-        result = agent.invoke(state)
+        result = await get_agent().ainvoke(state)
         
         # Extract response
         if result and "messages" in result:
@@ -495,7 +552,7 @@ async def chat_endpoint(request: Dict[str, Any]):
         return {
             "response": response,
             "model": MODEL_NAME,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "tools_used": result.get("tools_used", [])
         }
         
@@ -503,21 +560,40 @@ async def chat_endpoint(request: Dict[str, Any]):
         logger.error(f"Error in chat endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _stream_chat(message: str):
+    """Yield the LLM's answer to message as Ollama generates it"""
+    try:
+        async for chunk in get_llm().astream(build_agent_prompt(message, {})):
+            yield chunk
+    except Exception as e:
+        # Headers are already sent, so the error can only be reported in the body
+        logger.error(f"Error in chat stream: {e}")
+        yield f"\nSorry, I encountered an error: {str(e)}"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """Chat endpoint that streams the answer as plain text while it is generated"""
+    message = request.message
+    if not message:
+        raise HTTPException(status_code=400, detail="Message is required")
+    
+    return StreamingResponse(_stream_chat(message), media_type="text/plain")
+
 @app.post("/analyze-logs")
-async def analyze_logs(request: Dict[str, Any]):
+async def analyze_logs(request: AnalyzeRequest):
     """Direct log analysis endpoint"""
     try:
-        query = request.get("query", "")
+        query = request.query
         if not query:
             raise HTTPException(status_code=400, detail="Query is required")
         
         # Use the query_loki_logs tool directly
-        result = query_loki_logs(query)
+        result = await query_loki_logs.ainvoke({"query": query})
         
         return {
             "query": query,
             "result": result,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
         
     except Exception as e:
@@ -528,11 +604,11 @@ async def analyze_logs(request: Dict[str, Any]):
 async def test_analysis():
     """Analyze test failures"""
     try:
-        result = analyze_test_failures()
+        result = await analyze_test_failures.ainvoke({})
         
         return {
             "analysis": result,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
         
     except Exception as e:
@@ -543,11 +619,11 @@ async def test_analysis():
 async def system_health():
     """Get system health status"""
     try:
-        result = get_system_health()
+        result = await get_system_health.ainvoke({})
         
         return {
             "health": result,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
         
     except Exception as e:
@@ -557,14 +633,15 @@ async def system_health():
 @app.get("/monitoring/status")
 async def monitoring_status():
     """Get monitoring status and alerts"""
+    state = monitoring_state
     return {
         "monitoring_enabled": MONITORING_ENABLED,
         "monitoring_interval": MONITORING_INTERVAL,
         "alert_threshold": ALERT_THRESHOLD,
-        "last_check": monitoring_state.get("last_check"),
-        "error_count": monitoring_state.get("error_count", 0),
-        "alerts": monitoring_state.get("alerts", []),
-        "is_monitoring": monitoring_state.get("is_monitoring", False)
+        "last_check": state.last_check,
+        "error_count": state.error_count,
+        "alerts": state.alerts,
+        "is_monitoring": state.is_monitoring
     }
 
 @app.post("/monitoring/start")
@@ -592,6 +669,19 @@ async def stop_monitoring_endpoint():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.on_event("startup")
+async def startup():
+    """Start proactive monitoring if enabled"""
+    if MONITORING_ENABLED:
+        start_monitoring()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop monitoring and close the pooled MCP client"""
+    stop_monitoring()
+    await asyncio.gather(*_flush_tasks, return_exceptions=True)
+    await ASYNC_HTTP.aclose()
+
 if __name__ == "__main__":
     logger.info(f"Starting Agent Legacy on port {AGENT_PORT}")
     logger.info(f"Ollama URL: {OLLAMA_URL}")
@@ -600,13 +690,13 @@ if __name__ == "__main__":
     logger.info(f"Monitoring enabled: {MONITORING_ENABLED}")
     logger.info(f"Monitoring interval: {MONITORING_INTERVAL}s")
     
-    # Start proactive monitoring if enabled
-    if MONITORING_ENABLED:
-        start_monitoring()
-    
+    # uvloop and httptools ship with uvicorn[standard]; per-request access logging is skipped on the hot path
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=AGENT_PORT,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        access_log=False
     )
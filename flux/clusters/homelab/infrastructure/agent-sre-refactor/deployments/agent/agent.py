@@ -6,24 +6,165 @@ Handles HTTP API requests and communicates with MCP server
 
 import os
 import json
+import signal
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
-from aiohttp import web, ClientSession
+import hashlib
+import functools
+import itertools
+import random
+import orjson
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+from aiohttp import web, ClientSession, ClientTimeout, TCPConnector
 from aiohttp.web import Request, Response
+from cachetools import TTLCache
 
 # Import the SRE agent from local core
-from core import agent, logger
+from core import agent, logger, serve, _now_iso
+
+SERVICE_NAME = "sre-agent"
+DEPLOYMENT = "standalone-agent"
+
+# Largest request body accepted by the API endpoints
+MAX_BODY_SIZE = int(os.getenv("MAX_BODY_SIZE", str(1024 * 1024)))
+
+# Listen socket accept queue length
+LISTEN_BACKLOG = int(os.getenv("LISTEN_BACKLOG", "2048"))
+
+# Only log health/readiness checks in debug mode
+_DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
+# MCP server health probes use a shorter timeout than tool calls
+_PROBE_TIMEOUT = ClientTimeout(total=5)
+
+# MCP server health is refreshed in the background and served from cache for this long
+MCP_PROBE_INTERVAL = float(os.getenv("MCP_PROBE_INTERVAL", "2.0"))
+
+# Constant response fields, built once at import time
+_HEALTH_BASE = {
+    "status": "healthy",
+    "service": SERVICE_NAME,
+    "uptime": "running",
+    "version": "1.0.0",
+    "deployment": DEPLOYMENT
+}
+_HEALTH_BODY_PREFIX = orjson.dumps(_HEALTH_BASE)[:-1] + b',"timestamp":"'
+_READY_FIELDS = {"status": "ready", "service": SERVICE_NAME, "deployment": DEPLOYMENT}
+_STATUS_FIELDS = {"service": SERVICE_NAME, "deployment": DEPLOYMENT}
+_DIRECT_FIELDS = {"service": SERVICE_NAME, "method": "direct"}
+_MCP_FIELDS = {"service": SERVICE_NAME, "method": "mcp"}
+
+# Agent endpoints served directly and via the MCP server:
+# route -> (request field, missing-field error, response key, agent method, MCP tool)
+_ROUTES = {
+    "chat": ("message", "Message is required", "response", "chat", "sre_chat"),
+    "analyze-logs": ("logs", "Logs are required", "analysis", "analyze_logs", "analyze_logs"),
+    "incident-response": (
+        "incident", "Incident description is required", "response", "incident_response", "incident_response"
+    ),
+    "monitoring-advice": (
+        "system", "System description is required", "advice", "monitoring_advice", "monitoring_advice"
+    ),
+}
+
+# Identical prompts within the TTL are answered from cache instead of the LLM
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+# Encoded /health body, rebuilt only when the cached timestamp changes
+_HEALTH_CACHE = {"ts": "", "body": b""}
+
+def json_response(data: Any, status: int = 200) -> Response:
+    """Build a JSON response encoded with orjson."""
+    return web.Response(body=orjson.dumps(data), status=status, content_type="application/json")
+
+def _orjson_dumps_str(data: Any) -> str:
+    """orjson encoder for aiohttp's json_serialize hook, which expects a str."""
+    return orjson.dumps(data).decode()
+
+def _json_error(exc_class, message: str, **kwargs) -> web.HTTPException:
+    """Build an aiohttp HTTP error carrying the service's JSON error body."""
+    return exc_class(text=orjson.dumps({"error": message}).decode(), content_type="application/json", **kwargs)
+
+async def _read_json(request: Request) -> Dict[str, Any]:
+    """Read a bounded request body and decode it as a JSON object."""
+    length = request.content_length
+    if length is not None and length > MAX_BODY_SIZE:
+        raise _json_error(
+            web.HTTPRequestEntityTooLarge,
+            f"Request body exceeds {MAX_BODY_SIZE} bytes",
+            max_size=MAX_BODY_SIZE,
+            actual_size=length
+        )
+    try:
+        data = orjson.loads(await request.read())
+    except orjson.JSONDecodeError:
+        raise _json_error(web.HTTPBadRequest, "Request body must be valid JSON")
+    if not isinstance(data, dict):
+        raise _json_error(web.HTTPBadRequest, "Request body must be a JSON object")
+    return data
+
+def _health_body() -> bytes:
+    """Return the encoded liveness body for the current cached timestamp."""
+    ts = _now_iso()
+    if ts is not _HEALTH_CACHE["ts"]:
+        _HEALTH_CACHE["ts"] = ts
+        _HEALTH_CACHE["body"] = _HEALTH_BODY_PREFIX + ts.encode() + b'"}'
+    return _HEALTH_CACHE["body"]
 
 class SREAgentService:
     """Standalone SRE Agent Service."""
     
     def __init__(self):
         self.sre_agent = agent
-        self.app = web.Application()
+        self.app = web.Application(client_max_size=MAX_BODY_SIZE)
         self.mcp_server_url = os.getenv("MCP_SERVER_URL", "http://sre-agent-mcp-server-service:30120")
+        self._health_url = f"{self.mcp_server_url}/health"
+        self._mcp_url = f"{self.mcp_server_url}/mcp"
+        self._session: Optional[ClientSession] = None
+        self._mcp_ids = itertools.count(1)
+        self._resp_cache: TTLCache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self._resp_inflight: Dict[Tuple[str, bytes], asyncio.Future] = {}
+        self._mcp_probe: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+        self._mcp_prober: Optional[asyncio.Task] = None
         self._setup_routes()
+        self.app.on_startup.append(self._on_startup)
+        self.app.on_cleanup.append(self._on_cleanup)
+    
+    async def _on_startup(self, app: web.Application):
+        """Create the shared HTTP client session and start the MCP health prober."""
+        await self._get_session()
+        self._mcp_prober = asyncio.create_task(self._mcp_probe_loop())
+    
+    async def _on_cleanup(self, app: web.Application):
+        """Stop the background tasks and close the shared HTTP client session."""
+        if self._mcp_prober is not None:
+            self._mcp_prober.cancel()
+            await asyncio.gather(self._mcp_prober, return_exceptions=True)
+            self._mcp_prober = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _get_session(self) -> ClientSession:
+        """Return the shared HTTP client session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            # Nearly all traffic goes to the single MCP host: size the per-host pool for it and cache DNS
+            connector = TCPConnector(
+                limit=200,
+                limit_per_host=64,
+                ttl_dns_cache=300,
+                use_dns_cache=True,
+                keepalive_timeout=75,
+                enable_cleanup_closed=True,
+                force_close=False
+            )
+            self._session = ClientSession(
+                connector=connector,
+                timeout=ClientTimeout(total=30, connect=2),
+                json_serialize=_orjson_dumps_str
+            )
+        return self._session
     
     def _setup_routes(self):
         """Setup HTTP routes."""
@@ -32,16 +173,12 @@ class SREAgentService:
         self.app.router.add_get('/ready', self.handle_readiness)
         
         # Agent API endpoints
-        self.app.router.add_post('/chat', self.handle_chat)
-        self.app.router.add_post('/analyze-logs', self.handle_analyze_logs)
-        self.app.router.add_post('/incident-response', self.handle_incident_response)
-        self.app.router.add_post('/monitoring-advice', self.handle_monitoring_advice)
+        for route in _ROUTES:
+            self.app.router.add_post(f'/{route}', functools.partial(self._handle_direct, route))
         
         # MCP server communication endpoints
-        self.app.router.add_post('/mcp/chat', self.handle_mcp_chat)
-        self.app.router.add_post('/mcp/analyze-logs', self.handle_mcp_analyze_logs)
-        self.app.router.add_post('/mcp/incident-response', self.handle_mcp_incident_response)
-        self.app.router.add_post('/mcp/monitoring-advice', self.handle_mcp_monitoring_advice)
+        for route in _ROUTES:
+            self.app.router.add_post(f'/mcp/{route}', functools.partial(self._handle_mcp, route))
         
         # Status and info endpoints
         self.app.router.add_get('/status', self.handle_status)
@@ -50,21 +187,13 @@ class SREAgentService:
     async def handle_health(self, request: Request) -> Response:
         """Liveness probe endpoint."""
         try:
-            health_status = {
-                "status": "healthy",
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "uptime": "running",
-                "version": "1.0.0",
-                "deployment": "standalone-agent"
-            }
-            # Only log health checks in debug mode
-            if os.getenv("DEBUG", "false").lower() == "true":
-                logger.debug(f"Health check: {health_status}")
-            return web.json_response(health_status)
+            body = _health_body()
+            if _DEBUG:
+                logger.debug(f"Health check: {body.decode()}")
+            return web.Response(body=body, content_type="application/json")
         except Exception as e:
             logger.error(f"Health check failed: {e}")
-            return web.json_response(
+            return json_response(
                 {"status": "unhealthy", "error": str(e)}, 
                 status=503
             )
@@ -74,7 +203,7 @@ class SREAgentService:
         try:
             # Check if the SRE agent is properly initialized
             if not self.sre_agent or not self.sre_agent.llm:
-                return web.json_response(
+                return json_response(
                     {"status": "not_ready", "reason": "SRE agent not initialized"}, 
                     status=503
                 )
@@ -82,237 +211,68 @@ class SREAgentService:
             # Check MCP server connectivity
             mcp_status = await self._check_mcp_server()
             
-            readiness_status = {
-                "status": "ready",
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "mcp_server_status": mcp_status,
-                "deployment": "standalone-agent"
-            }
-            # Only log readiness checks in debug mode
-            if os.getenv("DEBUG", "false").lower() == "true":
+            readiness_status = {**_READY_FIELDS, "timestamp": _now_iso(), "mcp_server_status": mcp_status}
+            if _DEBUG:
                 logger.debug(f"Readiness check: {readiness_status}")
-            return web.json_response(readiness_status)
+            return json_response(readiness_status)
             
         except Exception as e:
             logger.error(f"Readiness check failed: {e}")
-            return web.json_response(
+            return json_response(
                 {"status": "not_ready", "error": str(e)}, 
                 status=503
             )
     
-    async def handle_chat(self, request: Request) -> Response:
-        """Direct chat endpoint using local agent."""
-        try:
-            data = await request.json()
-            message = data.get("message", "")
-            
-            if not message:
-                return web.json_response(
-                    {"error": "Message is required"},
-                    status=400
-                )
-            
-            response = await self.sre_agent.chat(message)
-            return web.json_response({
-                "response": response,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "method": "direct"
-            })
-        
-        except Exception as e:
-            logger.error(f"Error in chat handler: {e}")
-            return web.json_response(
-                {"error": str(e)},
-                status=500
-            )
-    
-    async def handle_analyze_logs(self, request: Request) -> Response:
-        """Direct log analysis endpoint using local agent."""
-        try:
-            data = await request.json()
-            logs = data.get("logs", "")
-            
-            if not logs:
-                return web.json_response(
-                    {"error": "Logs are required"},
-                    status=400
-                )
-            
-            analysis = await self.sre_agent.analyze_logs(logs)
-            return web.json_response({
-                "analysis": analysis,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "method": "direct"
-            })
-        
-        except Exception as e:
-            logger.error(f"Error in analyze_logs handler: {e}")
-            return web.json_response(
-                {"error": str(e)},
-                status=500
-            )
-    
-    async def handle_incident_response(self, request: Request) -> Response:
-        """Direct incident response endpoint using local agent."""
-        try:
-            data = await request.json()
-            incident = data.get("incident", "")
-            
-            if not incident:
-                return web.json_response(
-                    {"error": "Incident description is required"},
-                    status=400
-                )
-            
-            response = await self.sre_agent.incident_response(incident)
-            return web.json_response({
-                "response": response,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "method": "direct"
-            })
-        
-        except Exception as e:
-            logger.error(f"Error in incident_response handler: {e}")
-            return web.json_response(
-                {"error": str(e)},
-                status=500
-            )
-    
-    async def handle_monitoring_advice(self, request: Request) -> Response:
-        """Direct monitoring advice endpoint using local agent."""
-        try:
-            data = await request.json()
-            system = data.get("system", "")
-            
-            if not system:
-                return web.json_response(
-                    {"error": "System description is required"},
-                    status=400
-                )
-            
-            advice = await self.sre_agent.monitoring_advice(system)
-            return web.json_response({
-                "advice": advice,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "method": "direct"
-            })
-        
-        except Exception as e:
-            logger.error(f"Error in monitoring_advice handler: {e}")
-            return web.json_response(
-                {"error": str(e)},
-                status=500
-            )
-    
-    async def handle_mcp_chat(self, request: Request) -> Response:
-        """Chat endpoint via MCP server."""
+    async def _handle_direct(self, route: str, request: Request) -> Response:
+        """Direct endpoint using local agent."""
+        field, missing_error, out_key, agent_method, _ = _ROUTES[route]
         try:
-            data = await request.json()
-            message = data.get("message", "")
+            data = await _read_json(request)
+            value = data.get(field, "")
             
-            if not message:
-                return web.json_response(
-                    {"error": "Message is required"},
+            if not value:
+                return json_response(
+                    {"error": missing_error},
                     status=400
                 )
+            # Non-string JSON values (numbers, lists) go into the prompt as their text form, as before caching
+            value = str(value)
             
-            result = await self._call_mcp_tool("sre_chat", {"message": message})
-            return web.json_response({
-                "response": result,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "method": "mcp"
-            })
+            result = await self._cached(route, value, lambda: getattr(self.sre_agent, agent_method)(value))
+            return json_response({out_key: result, **_DIRECT_FIELDS, "timestamp": _now_iso()})
         
+        except web.HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error in MCP chat handler: {e}")
-            return web.json_response(
+            logger.error(f"Error in {agent_method} handler: {e}")
+            return json_response(
                 {"error": str(e)},
                 status=500
             )
     
-    async def handle_mcp_analyze_logs(self, request: Request) -> Response:
-        """Log analysis endpoint via MCP server."""
+    async def _handle_mcp(self, route: str, request: Request) -> Response:
+        """Endpoint served via the MCP server."""
+        field, missing_error, out_key, agent_method, tool_name = _ROUTES[route]
         try:
-            data = await request.json()
-            logs = data.get("logs", "")
+            data = await _read_json(request)
+            value = data.get(field, "")
             
-            if not logs:
-                return web.json_response(
-                    {"error": "Logs are required"},
+            if not value:
+                return json_response(
+                    {"error": missing_error},
                     status=400
                 )
+            # Non-string JSON values (numbers, lists) go into the prompt as their text form, as before caching
+            value = str(value)
             
-            result = await self._call_mcp_tool("analyze_logs", {"logs": logs})
-            return web.json_response({
-                "analysis": result,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "method": "mcp"
-            })
+            result = await self._cached(f"mcp/{route}", value, lambda: self._call_mcp_tool(tool_name, {field: value}))
+            return json_response({out_key: result, **_MCP_FIELDS, "timestamp": _now_iso()})
         
+        except web.HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error in MCP analyze_logs handler: {e}")
-            return web.json_response(
-                {"error": str(e)},
-                status=500
-            )
-    
-    async def handle_mcp_incident_response(self, request: Request) -> Response:
-        """Incident response endpoint via MCP server."""
-        try:
-            data = await request.json()
-            incident = data.get("incident", "")
-            
-            if not incident:
-                return web.json_response(
-                    {"error": "Incident description is required"},
-                    status=400
-                )
-            
-            result = await self._call_mcp_tool("incident_response", {"incident": incident})
-            return web.json_response({
-                "response": result,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "method": "mcp"
-            })
-        
-        except Exception as e:
-            logger.error(f"Error in MCP incident_response handler: {e}")
-            return web.json_response(
-                {"error": str(e)},
-                status=500
-            )
-    
-    async def handle_mcp_monitoring_advice(self, request: Request) -> Response:
-        """Monitoring advice endpoint via MCP server."""
-        try:
-            data = await request.json()
-            system = data.get("system", "")
-            
-            if not system:
-                return web.json_response(
-                    {"error": "System description is required"},
-                    status=400
-                )
-            
-            result = await self._call_mcp_tool("monitoring_advice", {"system": system})
-            return web.json_response({
-                "advice": result,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "method": "mcp"
-            })
-        
-        except Exception as e:
-            logger.error(f"Error in MCP monitoring_advice handler: {e}")
-            return web.json_response(
+            logger.error(f"Error in MCP {agent_method} handler: {e}")
+            return json_response(
                 {"error": str(e)},
                 status=500
             )
@@ -323,18 +283,12 @@ class SREAgentService:
             health = await self.sre_agent.health_check()
             mcp_status = await self._check_mcp_server()
             
-            status = {
-                "agent": health,
-                "mcp_server": mcp_status,
-                "service": "sre-agent",
-                "timestamp": datetime.now().isoformat(),
-                "deployment": "standalone-agent"
-            }
-            return web.json_response(status)
+            status = {"agent": health, "mcp_server": mcp_status, **_STATUS_FIELDS, "timestamp": _now_iso()}
+            return json_response(status)
         
         except Exception as e:
             logger.error(f"Error in status handler: {e}")
-            return web.json_response(
+            return json_response(
                 {"error": str(e)},
                 status=500
             )
@@ -343,33 +297,74 @@ class SREAgentService:
         """MCP server status endpoint."""
         try:
             mcp_status = await self._check_mcp_server()
-            return web.json_response(mcp_status)
+            return json_response(mcp_status)
         
         except Exception as e:
             logger.error(f"Error in MCP status handler: {e}")
-            return web.json_response(
+            return json_response(
                 {"error": str(e)},
                 status=500
             )
     
-    async def _check_mcp_server(self) -> Dict[str, Any]:
+    async def _cached(self, endpoint: str, text: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached result for (endpoint, text), computing it once for concurrent callers."""
+        key = (endpoint, hashlib.blake2b(text.encode(), digest_size=16).digest())
+        cached = self._resp_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        task = self._resp_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._resp_inflight[key] = task
+            task.add_done_callback(lambda t: self._store_response(key, t))
+        # Shield so one client disconnecting does not cancel the call for the others
+        return await asyncio.shield(task)
+    
+    def _store_response(self, key: Tuple[str, bytes], task: asyncio.Future):
+        """Cache a finished result unless it failed or is an error message."""
+        self._resp_inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if isinstance(result, str) and not result.startswith("Error"):
+            self._resp_cache[key] = result
+    
+    async def _check_mcp_server(self, fresh: bool = False) -> Dict[str, Any]:
+        """Return MCP server connectivity, reusing a probe result younger than MCP_PROBE_INTERVAL."""
+        now = asyncio.get_running_loop().time()
+        checked_at, status = self._mcp_probe
+        if not fresh and status is not None and now - checked_at < MCP_PROBE_INTERVAL:
+            return status
+        status = await self._probe_mcp_server()
+        self._mcp_probe = (asyncio.get_running_loop().time(), status)
+        return status
+    
+    async def _mcp_probe_loop(self):
+        """Keep the cached MCP server probe warm so readiness checks never wait on the network."""
+        while True:
+            await self._check_mcp_server(fresh=True)
+            # Jitter keeps replicas from probing the MCP server in lockstep
+            await asyncio.sleep(MCP_PROBE_INTERVAL * random.uniform(0.75, 1.0))
+    
+    async def _probe_mcp_server(self) -> Dict[str, Any]:
         """Check MCP server connectivity."""
         try:
-            async with ClientSession() as session:
-                async with session.get(f"{self.mcp_server_url}/health", timeout=5) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "status": "connected",
-                            "url": self.mcp_server_url,
-                            "health": data
-                        }
-                    else:
-                        return {
-                            "status": "error",
-                            "url": self.mcp_server_url,
-                            "error": f"HTTP {response.status}"
-                        }
+            session = await self._get_session()
+            async with session.get(self._health_url, timeout=_PROBE_TIMEOUT) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    return {
+                        "status": "connected",
+                        "url": self.mcp_server_url,
+                        "health": data
+                    }
+                else:
+                    return {
+                        "status": "error",
+                        "url": self.mcp_server_url,
+                        "error": f"HTTP {response.status}"
+                    }
         except Exception as e:
             return {
                 "status": "disconnected",
@@ -380,30 +375,28 @@ class SREAgentService:
     async def _call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """Call MCP server tool."""
         try:
-            async with ClientSession() as session:
-                mcp_request = {
-                    "jsonrpc": "2.0",
-                    "id": 1,
-                    "method": "tools/call",
-                    "params": {
-                        "name": tool_name,
-                        "arguments": arguments
-                    }
+            mcp_request = {
+                "jsonrpc": "2.0",
+                "id": next(self._mcp_ids),
+                "method": "tools/call",
+                "params": {
+                    "name": tool_name,
+                    "arguments": arguments
                 }
-                
-                async with session.post(
-                    f"{self.mcp_server_url}/mcp",
-                    json=mcp_request,
-                    timeout=30
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if "result" in data and "content" in data["result"]:
-                            return data["result"]["content"][0]["text"]
-                        else:
-                            return f"Error: {data.get('error', 'Unknown error')}"
+            }
+            
+            # One POST per call: the MCP server answers a batch only once every item is done, so
+            # batching unrelated LLM calls would hold a quick one behind the slowest
+            session = await self._get_session()
+            async with session.post(self._mcp_url, json=mcp_request) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    if "result" in data and "content" in data["result"]:
+                        return data["result"]["content"][0]["text"]
                     else:
-                        return f"Error: HTTP {response.status}"
+                        return f"Error: {data.get('error', 'Unknown error')}"
+                else:
+                    return f"Error: HTTP {response.status}"
         
         except Exception as e:
             logger.error(f"Error calling MCP tool {tool_name}: {e}")
@@ -411,9 +404,10 @@ class SREAgentService:
     
     async def start_server(self, host: str = "0.0.0.0", port: int = 8080):
         """Start the agent server."""
-        runner = web.AppRunner(self.app)
+        # No per-request access log lines; idle keep-alive connections are held long enough for poll loops
+        runner = web.AppRunner(self.app, access_log=None, keepalive_timeout=75, tcp_keepalive=True)
         await runner.setup()
-        site = web.TCPSite(runner, host, port)
+        site = web.TCPSite(runner, host, port, backlog=LISTEN_BACKLOG, reuse_port=True)
         await site.start()
         
         logger.info(f"🌐 SRE Agent started on {host}:{port}")
@@ -436,13 +430,18 @@ async def main():
     service = SREAgentService()
     runner = await service.start_server(host, port)
     
+    # Run until SIGINT/SIGTERM (Kubernetes sends SIGTERM on pod shutdown)
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: stop.done() or stop.set_result(None))
+    
     try:
         logger.info("🏁 SRE Agent is running...")
-        await asyncio.Event().wait()  # Run forever
-    except KeyboardInterrupt:
+        await stop
         logger.info("🛑 Shutting down SRE Agent...")
     finally:
         await runner.cleanup()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    serve(main, int(os.getenv("AGENT_WORKERS", "1")))
@@ -5,40 +5,61 @@ Main agent functionality for SRE tasks using LangChain and Ollama
 """
 
 import os
-import json
+import sys
+import signal
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Awaitable, Callable
 from datetime import datetime
+import httpx
+import orjson
+import structlog
 
 # LangChain imports
 from langchain_ollama import OllamaLLM
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-from langchain.schema import HumanMessage, SystemMessage
 
-# LangSmith imports for tracing
-from langsmith import traceable
-from langsmith.wrappers import wrap_openai
-
-# Logfire imports
-import logfire
-
-# Configure logging
+# Configure logging: stdlib for third-party libraries, structlog rendering our own records
+# straight to JSON bytes on stdout (filtered-out levels are no-ops, no stdlib handler locking)
 logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+structlog.configure(
+    processors=[
+        structlog.processors.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.format_exc_info,
+        structlog.processors.JSONRenderer(serializer=orjson.dumps)
+    ],
+    wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
+    logger_factory=structlog.BytesLoggerFactory(sys.stdout.buffer),
+    cache_logger_on_first_use=True
+)
+logger = structlog.get_logger(__name__)
 
 # Configuration
 OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://192.168.0.3:11434")
 MODEL_NAME = os.environ.get("MODEL_NAME", "bruno-sre:latest")
 SERVICE_NAME = os.environ.get("SERVICE_NAME", "sre-agent")
+OLLAMA_TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT", "120"))
+OLLAMA_MAX_CONNECTIONS = int(os.environ.get("OLLAMA_MAX_CONNECTIONS", "64"))
+
+class _NoLogfire:
+    """Stand-in for logfire when it is not configured; instrument() leaves functions untouched."""
+    
+    def instrument(self, *args, **kwargs):
+        return lambda func: func
 
-# Configure Logfire
+def _no_traceable(*args, **kwargs):
+    """Stand-in for langsmith.traceable when LangSmith is not configured."""
+    return lambda func: func
+
+# Configure Logfire (only imported when a token is set)
 sre_agent_token = os.getenv('LOGFIRE_TOKEN_SRE_AGENT')
+logfire = _NoLogfire()
 if sre_agent_token:
     try:
-        logfire.configure(service_name=SERVICE_NAME, token=sre_agent_token)
+        import logfire as _logfire
+        _logfire.configure(service_name=SERVICE_NAME, token=sre_agent_token)
+        logfire = _logfire
         logger.info("✅ Logfire configured successfully")
     except Exception as e:
         logger.warning(f"⚠️  Logfire configuration failed: {e}")
@@ -48,10 +69,12 @@ if sre_agent_token:
 else:
     logger.warning("⚠️  LOGFIRE_TOKEN_SRE_AGENT not set, skipping Logfire configuration")
 
-# Configure LangChain API key
+# Configure LangChain API key (LangSmith tracing is only imported when a key is set)
 langsmith_api_key = os.getenv('LANGSMITH_API_KEY')
+traceable = _no_traceable
 if langsmith_api_key:
     os.environ['LANGCHAIN_API_KEY'] = langsmith_api_key
+    from langsmith import traceable
     logger.info("✅ LangSmith API key configured from environment")
 else:
     logger.warning("⚠️  LANGSMITH_API_KEY not set, LangSmith features will be limited")
@@ -64,28 +87,24 @@ try:
         temperature=0.7,
         top_p=0.9,
         num_ctx=4096,
-        num_predict=1000
+        num_predict=1000,
+        # Shared httpx pool with long keep-alive so successive calls reuse warm connections
+        client_kwargs={
+            "timeout": httpx.Timeout(OLLAMA_TIMEOUT, connect=5.0),
+            "limits": httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=32,
+                keepalive_expiry=120.0
+            )
+        }
     )
     logger.info(f"✅ Ollama connection established: {OLLAMA_URL}")
 except Exception as e:
     logger.error(f"❌ Error connecting to Ollama: {e}")
     llm = None
 
-class SREAgent:
-    """SRE Agent Core Class"""
-    
-    def __init__(self):
-        self.llm = llm
-        self.service_name = SERVICE_NAME
-        
-    @traceable(name="sre_chat", run_type="chain")
-    @logfire.instrument("sre_chat")
-    async def chat(self, message: str) -> str:
-        """Handle general SRE chat requests"""
-        if not self.llm:
-            return "Error: Ollama connection not available"
-        
-        prompt = ChatPromptTemplate.from_template("""
+# Prompt templates, parsed once at import time
+CHAT_PROMPT = ChatPromptTemplate.from_template("""
         You are an SRE (Site Reliability Engineering) AI assistant. 
         You help with monitoring, troubleshooting, and maintaining system reliability.
         
@@ -93,19 +112,8 @@ class SREAgent:
         
         Please provide a helpful and accurate response based on SRE best practices.
         """)
-        
-        chain = prompt | self.llm
-        response = chain.invoke({"question": message})
-        return response
-    
-    @traceable(name="sre_analyze_logs", run_type="chain")
-    @logfire.instrument("analyze_logs")
-    async def analyze_logs(self, logs: str) -> str:
-        """Analyze logs for SRE insights"""
-        if not self.llm:
-            return "Error: Ollama connection not available"
-        
-        prompt = ChatPromptTemplate.from_template("""
+
+ANALYZE_LOGS_PROMPT = ChatPromptTemplate.from_template("""
         As an SRE expert, analyze the following logs and provide insights:
         
         Logs:
@@ -117,19 +125,8 @@ class SREAgent:
         3. Recommended actions
         4. Monitoring suggestions
         """)
-        
-        chain = prompt | self.llm
-        analysis = chain.invoke({"logs": logs})
-        return analysis
-    
-    @traceable(name="sre_incident_response", run_type="chain")
-    @logfire.instrument("incident_response")
-    async def incident_response(self, incident: str) -> str:
-        """Provide incident response guidance"""
-        if not self.llm:
-            return "Error: Ollama connection not available"
-        
-        prompt = ChatPromptTemplate.from_template("""
+
+INCIDENT_RESPONSE_PROMPT = ChatPromptTemplate.from_template("""
         As an SRE expert, provide incident response guidance for the following situation:
         
         Incident: {incident}
@@ -141,19 +138,8 @@ class SREAgent:
         4. Post-incident actions
         5. Prevention measures
         """)
-        
-        chain = prompt | self.llm
-        response = chain.invoke({"incident": incident})
-        return response
-    
-    @traceable(name="sre_monitoring_advice", run_type="chain")
-    @logfire.instrument("monitoring_advice")
-    async def monitoring_advice(self, system: str) -> str:
-        """Provide monitoring and alerting advice"""
-        if not self.llm:
-            return "Error: Ollama connection not available"
-        
-        prompt = ChatPromptTemplate.from_template("""
+
+MONITORING_ADVICE_PROMPT = ChatPromptTemplate.from_template("""
         As an SRE expert, provide monitoring and alerting advice for the following system:
         
         System: {system}
@@ -165,9 +151,65 @@ class SREAgent:
         4. Log analysis strategies
         5. Performance monitoring
         """)
+
+# Prompt kind -> (template, input variable)
+_PROMPTS = {
+    "chat": (CHAT_PROMPT, "question"),
+    "analyze_logs": (ANALYZE_LOGS_PROMPT, "logs"),
+    "incident_response": (INCIDENT_RESPONSE_PROMPT, "incident"),
+    "monitoring_advice": (MONITORING_ADVICE_PROMPT, "system"),
+}
+
+def render_prompt(kind: str, text: str) -> str:
+    """Render a prompt to the exact string the LLM receives."""
+    template, variable = _PROMPTS[kind]
+    return template.format(**{variable: text})
+
+class SREAgent:
+    """SRE Agent Core Class"""
+    
+    def __init__(self):
+        self.llm = llm
+        self.service_name = SERVICE_NAME
         
-        chain = prompt | self.llm
-        advice = chain.invoke({"system": system})
+    @traceable(name="sre_chat", run_type="chain")
+    @logfire.instrument("sre_chat")
+    async def chat(self, message: str) -> str:
+        """Handle general SRE chat requests"""
+        if not self.llm:
+            return "Error: Ollama connection not available"
+        
+        response = await self.llm.ainvoke(render_prompt("chat", message))
+        return response
+    
+    @traceable(name="sre_analyze_logs", run_type="chain")
+    @logfire.instrument("analyze_logs")
+    async def analyze_logs(self, logs: str) -> str:
+        """Analyze logs for SRE insights"""
+        if not self.llm:
+            return "Error: Ollama connection not available"
+        
+        analysis = await self.llm.ainvoke(render_prompt("analyze_logs", logs))
+        return analysis
+    
+    @traceable(name="sre_incident_response", run_type="chain")
+    @logfire.instrument("incident_response")
+    async def incident_response(self, incident: str) -> str:
+        """Provide incident response guidance"""
+        if not self.llm:
+            return "Error: Ollama connection not available"
+        
+        response = await self.llm.ainvoke(render_prompt("incident_response", incident))
+        return response
+    
+    @traceable(name="sre_monitoring_advice", run_type="chain")
+    @logfire.instrument("monitoring_advice")
+    async def monitoring_advice(self, system: str) -> str:
+        """Provide monitoring and alerting advice"""
+        if not self.llm:
+            return "Error: Ollama connection not available"
+        
+        advice = await self.llm.ainvoke(render_prompt("monitoring_advice", system))
         return advice
     
     @logfire.instrument("health_check")
@@ -182,8 +224,93 @@ class SREAgent:
             "llm_connected": self.llm is not None
         }
 
+# Timestamp string cache; callers see the same string until TIMESTAMP_REFRESH seconds of loop time pass
+TIMESTAMP_REFRESH = 0.05
+_TS_CACHE = {"t": 0.0, "s": ""}
+
+def _now_iso() -> str:
+    """Return the current ISO timestamp, reformatted at most once per TIMESTAMP_REFRESH seconds"""
+    t = asyncio.get_running_loop().time()
+    if t - _TS_CACHE["t"] >= TIMESTAMP_REFRESH or not _TS_CACHE["s"]:
+        _TS_CACHE["t"] = t
+        _TS_CACHE["s"] = datetime.now().isoformat()
+    return _TS_CACHE["s"]
+
+def run_async(entrypoint: Callable[[], Awaitable[None]]):
+    """Run entrypoint to completion, on uvloop's event loop when it is installed"""
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(entrypoint())
+
+def serve(entrypoint: Callable[[], Awaitable[None]], workers: int):
+    """Run entrypoint in `workers` forked processes sharing the listen port via SO_REUSEPORT.
+    
+    The parent only supervises: it passes SIGINT/SIGTERM on to every worker, and when a worker
+    exits on its own it stops the others and exits non-zero so Kubernetes restarts the pod
+    instead of leaving it up with fewer workers.
+    """
+    if workers <= 1 or not hasattr(os, "fork"):
+        run_async(entrypoint)
+        return
+    
+    # Hold stop signals while forking so none arrives before the parent's handlers are in place
+    stop_signals = {signal.SIGINT, signal.SIGTERM}
+    signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+    children = {}
+    for index in range(workers):
+        # Fork before any event loop exists so every worker gets its own loop and connections
+        pid = os.fork()
+        if pid == 0:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+            code = 0
+            try:
+                run_async(entrypoint)
+            except BaseException:
+                code = 1
+                logger.exception(f"Worker {index} failed")
+            finally:
+                # os._exit skips interpreter shutdown, so flush buffered log output first
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        children[pid] = index
+    
+    stopping = False
+    
+    def stop(signum=None, frame=None):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    for sig in stop_signals:
+        signal.signal(sig, stop)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+    logger.info(f"👥 Started {workers} worker processes")
+    
+    failed = False
+    while children:
+        pid, status = os.wait()
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        logger.error(
+            f"Worker {index} exited unexpectedly with status {os.waitstatus_to_exitcode(status)}, "
+            "stopping the other workers"
+        )
+        failed = True
+        stop()
+    if failed:
+        sys.exit(1)
+
 # Global agent instance
 agent = SREAgent()
 
 # Export logger and logfire for use in other modules
-__all__ = ['agent', 'logger', 'logfire', 'SREAgent']
+__all__ = ['agent', 'logger', 'logfire', 'SREAgent', 'serve']
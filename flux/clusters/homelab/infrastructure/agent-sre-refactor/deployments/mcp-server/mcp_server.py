@@ -5,24 +5,326 @@ Handles MCP protocol communication and forwards requests to agent service
 """
 
 import os
-import json
+import signal
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import orjson
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set, Tuple, Union
 from datetime import datetime
-from aiohttp import web, ClientSession
+from aiohttp import web, ClientSession, ClientTimeout, TCPConnector
 from aiohttp.web import Request, Response
 
 # Import the core module for shared functionality
-from core import logger, logfire
+from core import logger, logfire, serve, _now_iso
+
+# Tools exposed through MCP tools/list
+_TOOLS = [
+    {
+        "name": "sre_chat",
+        "description": "General SRE chat and consultation",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "message": {
+                    "type": "string",
+                    "description": "Your SRE question or request"
+                }
+            },
+            "required": ["message"]
+        }
+    },
+    {
+        "name": "analyze_logs",
+        "description": "Analyze logs for SRE insights",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "logs": {
+                    "type": "string",
+                    "description": "Log data to analyze"
+                }
+            },
+            "required": ["logs"]
+        }
+    },
+    {
+        "name": "incident_response",
+        "description": "Get incident response guidance",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "incident": {
+                    "type": "string",
+                    "description": "Incident description"
+                }
+            },
+            "required": ["incident"]
+        }
+    },
+    {
+        "name": "monitoring_advice",
+        "description": "Get monitoring and alerting advice",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "system": {
+                    "type": "string",
+                    "description": "System description"
+                }
+            },
+            "required": ["system"]
+        }
+    },
+    {
+        "name": "health_check",
+        "description": "Check the health status",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "get_schema",
+        "description": "Get the input schema of a tool",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "name": {
+                    "type": "string",
+                    "description": "Tool name"
+                }
+            },
+            "required": ["name"]
+        }
+    }
+]
+
+# Compact listing (tools/list with {"compact": true}): names and descriptions only,
+# with input schemas fetched on demand through tools/get_schema or the get_schema tool
+_TOOL_SUMMARIES = [{"name": tool["name"], "description": tool["description"]} for tool in _TOOLS]
+_TOOL_SCHEMAS = {tool["name"]: tool["inputSchema"] for tool in _TOOLS}
+_SCHEMA_HINT = "call get_schema for parameters"
+
+# MCP tool name -> agent service endpoint, request argument and (response field, default)
+_ENDPOINT_MAP = {
+    "sre_chat": "/chat",
+    "analyze_logs": "/analyze-logs",
+    "incident_response": "/incident-response",
+    "monitoring_advice": "/monitoring-advice",
+    "health_check": "/health"
+}
+_ARG_KEY_MAP = {
+    "sre_chat": "message",
+    "analyze_logs": "logs",
+    "incident_response": "incident",
+    "monitoring_advice": "system"
+}
+_RESPONSE_KEY_MAP = {
+    "sre_chat": ("response", "No response"),
+    "analyze_logs": ("analysis", "No analysis"),
+    "incident_response": ("response", "No response"),
+    "monitoring_advice": ("advice", "No advice")
+}
+
+# Constant JSON-RPC replies, encoded once with a placeholder id that is patched per request
+_ID_PLACEHOLDER = b'"__ID__"'
+_TOOLS_LIST_TMPL = orjson.dumps({"jsonrpc": "2.0", "id": "__ID__", "result": {"tools": _TOOLS}})
+_TOOLS_SUMMARY_TMPL = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": "__ID__",
+    "result": {"tools": _TOOL_SUMMARIES, "hint": _SCHEMA_HINT}
+})
+_TOOL_SCHEMA_TMPLS = {
+    name: orjson.dumps({"jsonrpc": "2.0", "id": "__ID__", "result": {"name": name, "inputSchema": schema}})
+    for name, schema in _TOOL_SCHEMAS.items()
+}
+_TOOL_SCHEMA_TEXT = {
+    name: orjson.dumps(schema, option=orjson.OPT_INDENT_2).decode() for name, schema in _TOOL_SCHEMAS.items()
+}
+_INITIALIZE_TMPL = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": "__ID__",
+    "result": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {
+            "tools": {}
+        },
+        "serverInfo": {
+            "name": "sre-agent-mcp-server",
+            "version": "1.0.0"
+        }
+    }
+})
+
+# Listen socket accept queue length
+LISTEN_BACKLOG = int(os.getenv("LISTEN_BACKLOG", "2048"))
+
+# Keep-alive connections opened to the agent service at startup
+POOL_PREWARM = int(os.getenv("POOL_PREWARM", "2"))
+
+# Only log health/readiness checks in debug mode
+_DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
+# /mcp replies at least this large are gzipped for clients that accept it
+MCP_COMPRESS_MIN_SIZE = int(os.getenv("MCP_COMPRESS_MIN_SIZE", "1024"))
+
+# Agent service call timeouts, built once
+_TIMEOUT_TOOL = ClientTimeout(total=30, connect=5)
+_TIMEOUT_HEALTH_TOOL = ClientTimeout(total=10, connect=2)
+_TIMEOUT_PROBE = ClientTimeout(total=5, connect=2)
+
+# Agent service health is probed at most once per TTL; a last good result is kept through failures up to MAX_STALE
+AGENT_STATUS_TTL = float(os.getenv("AGENT_STATUS_TTL", "2.0"))
+AGENT_STATUS_MAX_STALE = float(os.getenv("AGENT_STATUS_MAX_STALE", "10.0"))
+
+# Seconds between SSE heartbeats, driven by a single ticker for all clients
+SSE_HEARTBEAT_INTERVAL = 10
+
+# SSE connection cap; clients that stop reading are dropped instead of buffering without bound
+MCP_MAX_SSE = int(os.getenv("MCP_MAX_SSE", "500"))
+SSE_MAX_BUFFER = 1 << 20
+SSE_WRITE_TIMEOUT = 10.0
+
+# SSE frames, formatted with a single %-interpolation per event
+_SSE_CONNECT_TMPL = b'data: {"type": "connected", "service": "sre-agent-mcp-server", "timestamp": "%s"}\n\n'
+_SSE_HB_TMPL = b'data: {"type": "heartbeat", "count": %d, "timestamp": "%s"}\n\n'
+
+_EMPTY_RESPONSE_BYTES = b"{}"
+_PARSE_ERROR = orjson.dumps({"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}})
+_INVALID_REQUEST = orjson.dumps({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}})
+
+def _with_id(template: bytes, request_id: Any) -> bytes:
+    """Fill the request id into a pre-encoded JSON-RPC reply."""
+    return template.replace(_ID_PLACEHOLDER, orjson.dumps(request_id), 1)
+
+def _encode(payload: Union[Dict[str, Any], bytes]) -> bytes:
+    """Encode a JSON-RPC reply unless it is already pre-encoded."""
+    return payload if isinstance(payload, bytes) else orjson.dumps(payload)
+
+def json_response(data: Any, status: int = 200) -> Response:
+    """Build a JSON response encoded with orjson."""
+    return web.Response(body=orjson.dumps(data), status=status, content_type="application/json")
+
+def _json_body(body: bytes, status: int = 200) -> Response:
+    """Build a JSON response from already-encoded bytes."""
+    return web.Response(body=body, status=status, content_type="application/json")
+
+@web.middleware
+async def _compress_mcp_responses(request: Request, handler) -> web.StreamResponse:
+    """Gzip large MCP protocol replies (tools/list schemas, LLM output) when the client accepts gzip."""
+    response = await handler(request)
+    if (
+        request.path.startswith("/mcp")
+        and isinstance(response, web.Response)
+        and response.body is not None
+        and len(response.body) >= MCP_COMPRESS_MIN_SIZE
+        and "gzip" in request.headers.get("Accept-Encoding", "")
+    ):
+        response.enable_compression(web.ContentCoding.gzip)
+    return response
 
 class MCPServer:
     """Thin MCP Server that forwards requests to agent service."""
     
     def __init__(self):
-        self.app = web.Application()
+        self.app = web.Application(middlewares=[_compress_mcp_responses])
         self.agent_service_url = os.getenv("AGENT_SERVICE_URL", "http://sre-agent-service:8080")
+        self._session: Optional[ClientSession] = None
+        self._agent_status: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._agent_status_lock = asyncio.Lock()
+        self._sse_tick: Optional[asyncio.Event] = None
+        self._sse_tick_ts = b""
+        self._sse_ticker: Optional[asyncio.Task] = None
+        self._sse_clients: Set[web.StreamResponse] = set()
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self._tool_urls = {tool: f"{self.agent_service_url}{endpoint}" for tool, endpoint in _ENDPOINT_MAP.items()}
+        self._info_body = orjson.dumps({
+            "name": "sre-agent-mcp-server",
+            "version": "1.0.0",
+            "description": "SRE Agent MCP Server - Thin protocol layer",
+            "protocol": "mcp",
+            "capabilities": {
+                "tools": True,
+                "resources": False,
+                "prompts": False
+            },
+            "endpoints": {
+                "mcp": "/mcp",
+                "health": "/health",
+                "ready": "/ready",
+                "sse": "/sse"
+            },
+            "agent_service": self.agent_service_url
+        })
+        # JSON-RPC method -> handler(request_id, params)
+        self._method_handlers: Dict[str, Callable[[Any, Dict[str, Any]], Awaitable[Tuple[Any, int]]]] = {
+            'initialize': self._handle_initialize,
+            'tools/list': self._handle_tools_list,
+            'tools/get_schema': self._handle_tools_get_schema,
+            'tools/call': self._handle_tools_call,
+        }
+        # Liveness body with a %s slot for the timestamp (literal % in the URL escaped)
+        self._health_tmpl = orjson.dumps({
+            "status": "healthy",
+            "service": "sre-agent-mcp-server",
+            "timestamp": "__TS__",
+            "uptime": "running",
+            "version": "1.0.0",
+            "deployment": "thin-mcp-server",
+            "agent_service_url": self.agent_service_url
+        }).replace(b"%", b"%%").replace(b'"__TS__"', b'"%s"')
         self._setup_routes()
+        self.app.on_startup.append(self._on_startup)
+        self.app.on_cleanup.append(self._on_cleanup)
+    
+    async def _on_startup(self, app: web.Application):
+        """Create the shared HTTP client session, prewarm its pool and start the SSE heartbeat ticker."""
+        await self._get_session()
+        self._prewarm_task = asyncio.create_task(self._prewarm())
+        self._sse_tick = asyncio.Event()
+        self._sse_ticker = asyncio.create_task(self._sse_tick_loop())
+    
+    async def _on_cleanup(self, app: web.Application):
+        """Stop the background tasks and close the shared HTTP client session."""
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+            await asyncio.gather(self._prewarm_task, return_exceptions=True)
+            self._prewarm_task = None
+        if self._sse_ticker is not None:
+            self._sse_ticker.cancel()
+            await asyncio.gather(self._sse_ticker, return_exceptions=True)
+            self._sse_ticker = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _prewarm(self):
+        """Open a couple of keep-alive connections to the agent so the first tool call skips DNS and TCP setup."""
+        session = await self._get_session()
+        
+        async def touch():
+            async with session.get(f"{self.agent_service_url}/health", timeout=_TIMEOUT_PROBE) as response:
+                await response.read()
+        
+        results = await asyncio.gather(*(touch() for _ in range(POOL_PREWARM)), return_exceptions=True)
+        # The agent may simply not be up yet; it will be connected on first use instead
+        if any(isinstance(result, Exception) for result in results):
+            logger.info("Agent service not reachable yet, skipping connection prewarm")
+    
+    async def _get_session(self) -> ClientSession:
+        """Return the shared HTTP client session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = TCPConnector(
+                limit=100,
+                limit_per_host=32,
+                keepalive_timeout=75,
+                ttl_dns_cache=300,
+                use_dns_cache=True,
+                enable_cleanup_closed=True,
+                force_close=False
+            )
+            self._session = ClientSession(connector=connector, timeout=ClientTimeout(total=30))
+        return self._session
     
     def _setup_routes(self):
         """Setup HTTP routes."""
@@ -39,288 +341,194 @@ class MCPServer:
         # SSE endpoint for real-time communication
         self.app.router.add_get('/sse', self.handle_sse)
     
-    @logfire.instrument("mcp_info")
+    @logfire.instrument("mcp_info", extract_args=False)
     async def handle_mcp_info(self, request: Request) -> Response:
         """Handle GET requests - MCP server information."""
-        return web.json_response({
-            "name": "sre-agent-mcp-server",
-            "version": "1.0.0",
-            "description": "SRE Agent MCP Server - Thin protocol layer",
-            "protocol": "mcp",
-            "capabilities": {
-                "tools": True,
-                "resources": False,
-                "prompts": False
-            },
-            "endpoints": {
-                "mcp": "/mcp",
-                "health": "/health",
-                "ready": "/ready",
-                "sse": "/sse"
-            },
-            "agent_service": self.agent_service_url
-        })
+        return _json_body(self._info_body)
     
-    @logfire.instrument("mcp_request")
+    @logfire.instrument("mcp_request", extract_args=False)
     async def handle_mcp_request(self, request: Request) -> Response:
-        """Handle MCP JSON-RPC 2.0 requests."""
+        """Handle MCP JSON-RPC 2.0 requests (single or batch)."""
         try:
-            data = await request.json()
+            data = orjson.loads(await request.read())
             
-            # Handle notifications (no id field)
-            if 'method' in data and 'id' not in data:
-                method = data.get('method')
-                if method == 'notifications/initialized':
-                    return web.json_response({})  # Empty response for notifications
-                else:
-                    return web.json_response({})  # Empty response for other notifications
+            # JSON-RPC 2.0 batch: process the calls concurrently, reply with an array
+            if isinstance(data, list):
+                # An empty batch is a single Invalid Request, not an empty array
+                if not data:
+                    return _json_body(_INVALID_REQUEST, status=400)
+                results = await asyncio.gather(*(self._process_message(item) for item in data))
+                # Notifications produce an empty payload and get no entry in the reply
+                replies = [_encode(payload) for payload, _ in results if payload is not _EMPTY_RESPONSE_BYTES]
+                if not replies:
+                    # A batch of only notifications gets no response body at all
+                    return web.Response(status=204)
+                return _json_body(b"[" + b",".join(replies) + b"]")
             
-            if 'method' in data and 'id' in data:
-                method = data.get('method')
-                params = data.get('params', {})
-                request_id = data.get('id')
+            payload, status = await self._process_message(data)
+            return _json_body(_encode(payload), status=status)
                 
-                if method == 'initialize':
-                    return web.json_response({
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "protocolVersion": "2024-11-05",
-                            "capabilities": {
-                                "tools": {}
-                            },
-                            "serverInfo": {
-                                "name": "sre-agent-mcp-server",
-                                "version": "1.0.0"
-                            }
-                        }
-                    })
-                
-                elif method == 'tools/list':
-                    tools = [
-                        {
-                            "name": "sre_chat",
-                            "description": "General SRE chat and consultation",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "message": {
-                                        "type": "string",
-                                        "description": "Your SRE question or request"
-                                    }
-                                },
-                                "required": ["message"]
-                            }
-                        },
-                        {
-                            "name": "analyze_logs",
-                            "description": "Analyze logs for SRE insights",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "logs": {
-                                        "type": "string",
-                                        "description": "Log data to analyze"
-                                    }
-                                },
-                                "required": ["logs"]
-                            }
-                        },
-                        {
-                            "name": "incident_response",
-                            "description": "Get incident response guidance",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "incident": {
-                                        "type": "string",
-                                        "description": "Incident description"
-                                    }
-                                },
-                                "required": ["incident"]
-                            }
-                        },
-                        {
-                            "name": "monitoring_advice",
-                            "description": "Get monitoring and alerting advice",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "system": {
-                                        "type": "string",
-                                        "description": "System description"
-                                    }
-                                },
-                                "required": ["system"]
-                            }
-                        },
-                        {
-                            "name": "health_check",
-                            "description": "Check the health status",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {}
-                            }
-                        }
-                    ]
-                    
-                    return web.json_response({
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "tools": tools
-                        }
-                    })
-                
-                elif method == 'tools/call':
-                    tool_name = params.get('name')
-                    arguments = params.get('arguments', {})
-                    
-                    if not tool_name:
-                        return web.json_response({
-                            "jsonrpc": "2.0",
-                            "id": request_id,
-                            "error": {
-                                "code": -32602,
-                                "message": "Tool name is required"
-                            }
-                        })
-                    
-                    result = await self._forward_to_agent(tool_name, arguments)
-                    return web.json_response({
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": result
-                                }
-                            ]
-                        }
-                    })
-                
-                else:
-                    return web.json_response({
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "error": {
-                            "code": -32601,
-                            "message": f"Unknown method: {method}"
-                        }
-                    })
+        except Exception as e:
+            logger.error("Error handling MCP request: %s", e)
+            return json_response({
+                "jsonrpc": "2.0",
+                "error": {
+                    "code": -32603,
+                    "message": str(e)
+                }
+            }, status=500)
+    
+    async def _process_message(self, data: Any) -> Tuple[Union[Dict[str, Any], bytes], int]:
+        """Process a single JSON-RPC 2.0 message and return (payload or pre-encoded reply, HTTP status)."""
+        try:
+            if not isinstance(data, dict):
+                return {"jsonrpc": "2.0", "error": {"code": -32600, "message": "Invalid Request"}}, 400
             
-            else:
-                return web.json_response({
+            # Notifications (no id field) get an empty response; checked first as the most frequent case
+            if 'id' not in data:
+                if 'method' in data:
+                    return _EMPTY_RESPONSE_BYTES, 200
+                return _PARSE_ERROR, 400
+            
+            if 'method' not in data:
+                return _PARSE_ERROR, 400
+            
+            method = data['method']
+            request_id = data['id']
+            handler = self._method_handlers.get(method) if isinstance(method, str) else None
+            if handler is None:
+                return {
                     "jsonrpc": "2.0",
+                    "id": request_id,
                     "error": {
-                        "code": -32700,
-                        "message": "Parse error"
+                        "code": -32601,
+                        "message": f"Unknown method: {method}"
                     }
-                }, status=400)
+                }, 200
+            return await handler(request_id, data.get('params', {}))
                 
         except Exception as e:
-            logger.error(f"Error handling MCP request: {e}")
-            return web.json_response({
+            logger.error("Error handling MCP request: %s", e)
+            return {
                 "jsonrpc": "2.0",
+                "id": data.get('id') if isinstance(data, dict) else None,
                 "error": {
                     "code": -32603,
                     "message": str(e)
                 }
-            }, status=500)
+            }, 500
+    
+    async def _handle_initialize(self, request_id: Any, params: Dict[str, Any]) -> Tuple[bytes, int]:
+        """initialize: constant server capabilities."""
+        return _with_id(_INITIALIZE_TMPL, request_id), 200
+    
+    async def _handle_tools_list(self, request_id: Any, params: Dict[str, Any]) -> Tuple[bytes, int]:
+        """tools/list: full tool definitions, or names and descriptions only when compact is set."""
+        if params.get('compact'):
+            return _with_id(_TOOLS_SUMMARY_TMPL, request_id), 200
+        return _with_id(_TOOLS_LIST_TMPL, request_id), 200
+    
+    async def _handle_tools_get_schema(
+        self, request_id: Any, params: Dict[str, Any]
+    ) -> Tuple[Union[Dict[str, Any], bytes], int]:
+        """tools/get_schema: input schema of a single tool."""
+        template = _TOOL_SCHEMA_TMPLS.get(params.get('name'))
+        if template is None:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": -32602,
+                    "message": f"Unknown tool: {params.get('name')}"
+                }
+            }, 200
+        return _with_id(template, request_id), 200
+    
+    async def _handle_tools_call(self, request_id: Any, params: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """tools/call: run a tool, forwarding agent tools to the agent service."""
+        tool_name = params.get('name')
+        arguments = params.get('arguments', {})
+        
+        if not tool_name:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": -32602,
+                    "message": "Tool name is required"
+                }
+            }, 200
+        
+        if tool_name == "get_schema":
+            # Served locally from the tools table, no agent round trip
+            result = _TOOL_SCHEMA_TEXT.get(arguments.get("name"), f"❌ Unknown tool: {arguments.get('name')}")
+        else:
+            result = await self._forward_to_agent(tool_name, arguments)
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {
+                "content": [
+                    {
+                        "type": "text",
+                        "text": result
+                    }
+                ]
+            }
+        }, 200
     
-    @logfire.instrument("forward_to_agent")
+    @logfire.instrument("forward_to_agent", extract_args=["tool_name"])
     async def _forward_to_agent(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """Forward tool execution to the agent service."""
         try:
-            async with ClientSession() as session:
-                # Map MCP tool names to agent service endpoints
-                endpoint_map = {
-                    "sre_chat": "/chat",
-                    "analyze_logs": "/analyze-logs", 
-                    "incident_response": "/incident-response",
-                    "monitoring_advice": "/monitoring-advice",
-                    "health_check": "/health"
-                }
-                
-                endpoint = endpoint_map.get(tool_name)
-                if not endpoint:
-                    return f"❌ Unknown tool: {tool_name}"
-                
-                # Prepare request data
-                if tool_name == "sre_chat":
-                    request_data = {"message": arguments.get("message", "")}
-                elif tool_name == "analyze_logs":
-                    request_data = {"logs": arguments.get("logs", "")}
-                elif tool_name == "incident_response":
-                    request_data = {"incident": arguments.get("incident", "")}
-                elif tool_name == "monitoring_advice":
-                    request_data = {"system": arguments.get("system", "")}
-                elif tool_name == "health_check":
-                    request_data = {}
-                else:
-                    return f"❌ Unknown tool: {tool_name}"
-                
-                # Make request to agent service
-                url = f"{self.agent_service_url}{endpoint}"
-                
-                if tool_name == "health_check":
-                    # Health check is a GET request
-                    async with session.get(url, timeout=10) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            return json.dumps(data, indent=2)
-                        else:
-                            return f"Error: HTTP {response.status}"
-                else:
-                    # Other tools are POST requests
-                    async with session.post(url, json=request_data, timeout=30) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            # Extract the response based on the endpoint
-                            if tool_name == "sre_chat":
-                                return data.get("response", "No response")
-                            elif tool_name == "analyze_logs":
-                                return data.get("analysis", "No analysis")
-                            elif tool_name == "incident_response":
-                                return data.get("response", "No response")
-                            elif tool_name == "monitoring_advice":
-                                return data.get("advice", "No advice")
-                            else:
-                                return json.dumps(data, indent=2)
-                        else:
-                            error_text = await response.text()
-                            return f"Error: HTTP {response.status} - {error_text}"
+            url = self._tool_urls.get(tool_name)
+            if not url:
+                return f"❌ Unknown tool: {tool_name}"
+            
+            session = await self._get_session()
+            
+            if tool_name == "health_check":
+                # Health check is a GET request
+                async with session.get(url, timeout=_TIMEOUT_HEALTH_TOOL) as response:
+                    if response.status == 200:
+                        data = orjson.loads(await response.read())
+                        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+                    else:
+                        return f"Error: HTTP {response.status}"
+            else:
+                # Other tools are POST requests carrying their single argument
+                arg_key = _ARG_KEY_MAP[tool_name]
+                request_data = {arg_key: arguments.get(arg_key, "")}
+                async with session.post(url, json=request_data, timeout=_TIMEOUT_TOOL) as response:
+                    if response.status == 200:
+                        data = orjson.loads(await response.read())
+                        # Extract the response field for the endpoint
+                        key, default = _RESPONSE_KEY_MAP[tool_name]
+                        return data.get(key, default)
+                    else:
+                        error_text = await response.text()
+                        return f"Error: HTTP {response.status} - {error_text}"
         
         except Exception as e:
-            logger.error(f"Error forwarding to agent service: {e}")
+            logger.error("Error forwarding to agent service: %s", e)
             return f"Error forwarding to agent service: {str(e)}"
     
-    @logfire.instrument("mcp_health")
+    @logfire.instrument("mcp_health", extract_args=False)
     async def handle_health(self, request: Request) -> Response:
         """Liveness probe endpoint - checks if the service is alive."""
         try:
-            health_status = {
-                "status": "healthy",
-                "service": "sre-agent-mcp-server",
-                "timestamp": datetime.now().isoformat(),
-                "uptime": "running",
-                "version": "1.0.0",
-                "deployment": "thin-mcp-server",
-                "agent_service_url": self.agent_service_url
-            }
-            # Only log health checks in debug mode
-            if os.getenv("DEBUG", "false").lower() == "true":
-                logger.debug(f"Health check: {health_status}")
-            return web.json_response(health_status)
+            body = self._health_tmpl % _now_iso().encode()
+            if _DEBUG:
+                logger.debug(f"Health check: {body.decode()}")
+            return _json_body(body)
         except Exception as e:
-            logger.error(f"Health check failed: {e}")
-            return web.json_response(
+            logger.error("Health check failed: %s", e)
+            return json_response(
                 {"status": "unhealthy", "error": str(e)}, 
                 status=503
             )
     
-    @logfire.instrument("mcp_readiness")
+    @logfire.instrument("mcp_readiness", extract_args=False)
     async def handle_readiness(self, request: Request) -> Response:
         """Readiness probe endpoint - checks if the service is ready to serve traffic."""
         try:
@@ -328,7 +536,7 @@ class MCPServer:
             agent_status = await self._check_agent_service()
             
             if agent_status.get("status") != "connected":
-                return web.json_response(
+                return json_response(
                     {"status": "not_ready", "reason": "Agent service not available", "agent_status": agent_status}, 
                     status=503
                 )
@@ -341,37 +549,61 @@ class MCPServer:
                 "mcp_endpoints": ["/mcp", "/health", "/ready", "/sse"],
                 "deployment": "thin-mcp-server"
             }
-            # Only log readiness checks in debug mode
-            if os.getenv("DEBUG", "false").lower() == "true":
+            if _DEBUG:
                 logger.debug(f"Readiness check: {readiness_status}")
-            return web.json_response(readiness_status)
+            return json_response(readiness_status)
             
         except Exception as e:
-            logger.error(f"Readiness check failed: {e}")
-            return web.json_response(
+            logger.error("Readiness check failed: %s", e)
+            return json_response(
                 {"status": "not_ready", "error": str(e)}, 
                 status=503
             )
     
-    @logfire.instrument("check_agent_service")
+    @logfire.instrument("check_agent_service", extract_args=False)
     async def _check_agent_service(self) -> Dict[str, Any]:
+        """Return agent service connectivity, probing at most once per AGENT_STATUS_TTL."""
+        clock = asyncio.get_running_loop().time
+        cached = self._agent_status
+        if cached is not None and clock() - cached[0] < AGENT_STATUS_TTL:
+            return cached[1]
+        
+        # Concurrent callers wait for one probe instead of each hitting the agent
+        async with self._agent_status_lock:
+            cached = self._agent_status
+            if cached is not None and clock() - cached[0] < AGENT_STATUS_TTL:
+                return cached[1]
+            
+            status = await self._probe_agent_service()
+            now = clock()
+            if status.get("status") == "connected":
+                self._agent_status = (now, status)
+                return status
+            # Ride out a transient failure on the last good result, for at most AGENT_STATUS_MAX_STALE
+            last_good = cached is not None and cached[1].get("status") == "connected"
+            if last_good and now - cached[0] < AGENT_STATUS_MAX_STALE:
+                return cached[1]
+            self._agent_status = (now, status)
+            return status
+    
+    async def _probe_agent_service(self) -> Dict[str, Any]:
         """Check agent service connectivity."""
         try:
-            async with ClientSession() as session:
-                async with session.get(f"{self.agent_service_url}/health", timeout=5) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "status": "connected",
-                            "url": self.agent_service_url,
-                            "health": data
-                        }
-                    else:
-                        return {
-                            "status": "error",
-                            "url": self.agent_service_url,
-                            "error": f"HTTP {response.status}"
-                        }
+            session = await self._get_session()
+            async with session.get(f"{self.agent_service_url}/health", timeout=_TIMEOUT_PROBE) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    return {
+                        "status": "connected",
+                        "url": self.agent_service_url,
+                        "health": data
+                    }
+                else:
+                    return {
+                        "status": "error",
+                        "url": self.agent_service_url,
+                        "error": f"HTTP {response.status}"
+                    }
         except Exception as e:
             return {
                 "status": "disconnected",
@@ -379,9 +611,12 @@ class MCPServer:
                 "error": str(e)
             }
     
-    @logfire.instrument("mcp_sse")
+    @logfire.instrument("mcp_sse", extract_args=False)
     async def handle_sse(self, request: Request) -> Response:
         """Server-Sent Events endpoint for real-time communication."""
+        if len(self._sse_clients) >= MCP_MAX_SSE:
+            return json_response({"error": "Too many SSE clients"}, status=503)
+        
         response = web.StreamResponse()
         response.headers['Content-Type'] = 'text/event-stream'
         response.headers['Cache-Control'] = 'no-cache'
@@ -389,31 +624,59 @@ class MCPServer:
         response.headers['Access-Control-Allow-Origin'] = '*'
         
         await response.prepare(request)
+        self._sse_clients.add(response)
+        stalled = False
         
         try:
             # Send initial connection event
-            await response.write(b"data: {\"type\": \"connected\", \"service\": \"sre-agent-mcp-server\", \"timestamp\": \"" + 
-                               datetime.now().isoformat().encode() + b"\"}\n\n")
+            await asyncio.wait_for(response.write(_SSE_CONNECT_TMPL % _now_iso().encode()), SSE_WRITE_TIMEOUT)
             
-            # Send heartbeat every 10 seconds
+            # Send heartbeat on every shared 10 second tick
             for i in range(100):  # Send heartbeats for ~16 minutes
-                await asyncio.sleep(10)
-                await response.write(b"data: {\"type\": \"heartbeat\", \"count\": " + 
-                                   str(i).encode() + b", \"timestamp\": \"" + 
-                                   datetime.now().isoformat().encode() + b"\"}\n\n")
+                await self._sse_tick.wait()
+                transport = request.transport
+                if transport is None or transport.is_closing():
+                    break
+                if transport.get_write_buffer_size() > SSE_MAX_BUFFER:
+                    stalled = True
+                    break
+                await asyncio.wait_for(response.write(_SSE_HB_TMPL % (i, self._sse_tick_ts)), SSE_WRITE_TIMEOUT)
                 
+        except asyncio.TimeoutError:
+            stalled = True
+        except ConnectionResetError:
+            pass  # Client went away
         except Exception as e:
-            logger.error(f"SSE error: {e}")
+            logger.error("SSE error: %s", e)
         finally:
-            await response.write_eof()
+            self._sse_clients.discard(response)
+            if stalled:
+                # Closing the transport frees its buffer; a final write would block on the same client
+                logger.warning("Dropping slow SSE client")
+                if request.transport is not None:
+                    request.transport.close()
+            else:
+                try:
+                    await response.write_eof()
+                except ConnectionResetError:
+                    pass
         
         return response
     
+    async def _sse_tick_loop(self):
+        """Wake all SSE clients from one timer instead of a sleep per connection."""
+        while True:
+            await asyncio.sleep(SSE_HEARTBEAT_INTERVAL)
+            self._sse_tick_ts = _now_iso().encode()
+            # Swap in a fresh event before waking waiters so they re-arm on the next tick
+            tick, self._sse_tick = self._sse_tick, asyncio.Event()
+            tick.set()
+    
     async def start_server(self, host: str = "0.0.0.0", port: int = 30120):
         """Start the MCP server."""
         runner = web.AppRunner(self.app)
         await runner.setup()
-        site = web.TCPSite(runner, host, port)
+        site = web.TCPSite(runner, host, port, backlog=LISTEN_BACKLOG, reuse_port=True)
         await site.start()
         
         logger.info(f"🌐 MCP Server started on {host}:{port}")
@@ -436,13 +699,18 @@ async def main():
     server = MCPServer()
     runner = await server.start_server(host, port)
     
+    # Run until SIGINT/SIGTERM (Kubernetes sends SIGTERM on pod shutdown)
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: stop.done() or stop.set_result(None))
+    
     try:
         logger.info("🏁 MCP Server is running...")
-        await asyncio.Event().wait()  # Run forever
-    except KeyboardInterrupt:
+        await stop
         logger.info("🛑 Shutting down MCP Server...")
     finally:
         await runner.cleanup()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    serve(main, int(os.getenv("MCP_WORKERS", "1")))
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Event Loop Profiler
+Debug-only per-task timing of event loop steps, exposed over HTTP
+"""
+
+import os
+import time
+import asyncio
+import collections.abc
+from typing import Dict, Any, List, Optional
+
+import orjson
+from aiohttp import web
+from aiohttp.web import Request, Response
+
+# Profiling is off unless explicitly enabled; nothing here is installed otherwise
+ENABLE_PROFILE = os.environ.get("ENABLE_PROFILE", "").lower() in ("1", "true", "yes")
+# Loop callbacks running longer than this are logged by asyncio while profiling is enabled
+SLOW_CALLBACK_DURATION = float(os.environ.get("SLOW_CALLBACK_DURATION", "0.1"))
+MAX_PROFILE_DURATION = 300.0
+
+class _TimedCoroutine(collections.abc.Coroutine):
+    """Coroutine proxy that adds the wall time of every step to a shared stats table"""
+    
+    __slots__ = ("_coro", "_entry")
+    
+    def __init__(self, coro, entry: List[int]):
+        self._coro = coro
+        self._entry = entry
+    
+    def _record(self, started: int):
+        elapsed = time.perf_counter_ns() - started
+        entry = self._entry
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+    
+    def send(self, value):
+        started = time.perf_counter_ns()
+        try:
+            return self._coro.send(value)
+        finally:
+            self._record(started)
+    
+    def throw(self, *args):
+        started = time.perf_counter_ns()
+        try:
+            return self._coro.throw(*args)
+        finally:
+            self._record(started)
+    
+    def close(self):
+        return self._coro.close()
+    
+    def __await__(self):
+        return self._coro.__await__()
+
+class LoopProfiler:
+    """Times event loop steps per task name for a bounded window"""
+    
+    def __init__(self):
+        # Task name -> [steps, total ns, max ns]
+        self._stats: Dict[str, List[int]] = {}
+        self._active = False
+    
+    def _task_factory(self, loop, coro, **kwargs):
+        name = getattr(coro, "__qualname__", None) or type(coro).__name__
+        entry = self._stats.setdefault(name, [0, 0, 0])
+        return asyncio.Task(_TimedCoroutine(coro, entry), loop=loop, **kwargs)
+    
+    async def profile(self, duration: float) -> List[Dict[str, Any]]:
+        """Time every task created during the next duration seconds and return the busiest first"""
+        loop = asyncio.get_running_loop()
+        previous = loop.get_task_factory()
+        self._stats = {}
+        self._active = True
+        loop.set_task_factory(self._task_factory)
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            loop.set_task_factory(previous)
+            self._active = False
+        rows = [
+            {"task": name, "steps": steps, "total_ms": total / 1e6, "max_ms": worst / 1e6}
+            for name, (steps, total, worst) in self._stats.items()
+        ]
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+    
+    async def handle_profile(self, request: Request) -> Response:
+        """GET /debug/profile?duration=N - profile the loop for N seconds (default 10)"""
+        try:
+            duration = float(request.query.get("duration", "10"))
+        except ValueError:
+            return _json({"error": "duration must be a number"}, status=400)
+        if not 0 < duration <= MAX_PROFILE_DURATION:
+            return _json({"error": f"duration must be in (0, {MAX_PROFILE_DURATION:g}]"}, status=400)
+        if self._active:
+            return _json({"error": "a profile is already running"}, status=409)
+        
+        rows = await self.profile(duration)
+        return _json({
+            "duration_s": duration,
+            # Only tasks created inside the window are timed; long-lived tasks started earlier are not seen
+            "tasks": rows
+        })
+
+def _json(data: Any, status: int = 200) -> Response:
+    """Build a JSON response encoded with orjson"""
+    return web.Response(body=orjson.dumps(data), status=status, content_type="application/json")
+
+async def _enable_slow_callback_logging(app: web.Application):
+    """Have asyncio log callbacks that block the loop for longer than SLOW_CALLBACK_DURATION"""
+    loop = asyncio.get_running_loop()
+    loop.slow_callback_duration = SLOW_CALLBACK_DURATION
+    loop.set_debug(True)
+
+def setup_profiling(app: web.Application, profiler: Optional[LoopProfiler] = None):
+    """Register /debug/profile and slow-callback logging on app when ENABLE_PROFILE is set"""
+    if not ENABLE_PROFILE:
+        return
+    profiler = profiler or LoopProfiler()
+    app.router.add_get("/debug/profile", profiler.handle_profile)
+    app.on_startup.append(_enable_slow_callback_logging)
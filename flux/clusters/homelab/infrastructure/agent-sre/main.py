@@ -6,11 +6,21 @@ Main agent functionality for SRE tasks using LangChain and Ollama
 
 import os
 import json
+import time
+import signal
 import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 from datetime import datetime
+import httpx
+import numpy as np
+import orjson
 from aiohttp import web, web_request
+from cachetools import TTLCache
+from loop_profiler import setup_profiling
+import workers
 from aiohttp.web import Request, Response
 
 # LangChain imports
@@ -18,6 +28,7 @@ from langchain_ollama import OllamaLLM
 from langchain.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import HumanMessagePromptTemplate
 from langchain.schema import HumanMessage, SystemMessage
 
 # LangSmith imports for tracing
@@ -28,13 +39,46 @@ from langsmith.wrappers import wrap_openai
 import logfire
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+# LOG_LEVEL=WARNING silences the startup banner; request paths only log failures
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Configuration
 OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://192.168.0.12:11434")
 MODEL_NAME = os.environ.get("MODEL_NAME", "bruno-sre:latest")
 SERVICE_NAME = os.environ.get("SERVICE_NAME", "sre-agent")
+# Keep the model and its prompt KV cache loaded between requests
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_NUM_CTX = int(os.environ.get("OLLAMA_NUM_CTX", "4096"))
+OLLAMA_NUM_PREDICT = 1000
+OLLAMA_TEMPERATURE = 0.7
+OLLAMA_TOP_P = 0.9
+# Per-method sampling overrides. num_ctx is deliberately shared: a different value makes Ollama reload the model
+INFER_PARAMS_CHAT = MappingProxyType({"temperature": OLLAMA_TEMPERATURE, "num_predict": OLLAMA_NUM_PREDICT})
+INFER_PARAMS_ANALYZE = MappingProxyType({"temperature": 0.2, "num_predict": 1500})
+INFER_PARAMS_INCIDENT = MappingProxyType({"temperature": 0.3, "num_predict": OLLAMA_NUM_PREDICT})
+INFER_PARAMS_MONITOR = MappingProxyType({"temperature": 0.5, "num_predict": OLLAMA_NUM_PREDICT})
+# Token budget for pasted logs: what is left of the context after the answer and the static prompt
+LOGS_MAX_TOKENS = int(os.environ.get(
+    "LOGS_MAX_TOKENS", str(max(512, OLLAMA_NUM_CTX - INFER_PARAMS_ANALYZE["num_predict"] - 300))
+))
+# Generations can run for minutes on CPU, so only connecting is bounded tightly
+OLLAMA_TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT", "300"))
+OLLAMA_MAX_CONNECTIONS = int(os.environ.get("OLLAMA_MAX_CONNECTIONS", "100"))
+OLLAMA_MAX_KEEPALIVE = int(os.environ.get("OLLAMA_MAX_KEEPALIVE", "20"))
+
+# Response cache settings
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "3600"))
+# Ollama embedding model used to match similar prompts; semantic caching is off when unset
+SEMANTIC_CACHE_MODEL = os.environ.get("SEMANTIC_CACHE_MODEL", "")
+SEMANTIC_CACHE_SIZE = int(os.environ.get("SEMANTIC_CACHE_SIZE", "256"))
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+# Concurrent embedding lookups arriving within EMBED_BATCH_WAIT seconds share one /api/embed call
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "32"))
+EMBED_BATCH_WAIT = float(os.environ.get("EMBED_BATCH_WAIT", "0.02"))
+# Server processes sharing the listening port through SO_REUSEPORT; size it to the pod's CPU limit
+WEB_WORKERS = max(1, int(os.environ.get("WEB_WORKERS", "1")))
 
 # Configure Logfire
 sre_agent_token = os.getenv('LOGFIRE_TOKEN_SRE_AGENT')
@@ -43,7 +87,7 @@ if sre_agent_token:
         logfire.configure(service_name=SERVICE_NAME, token=sre_agent_token)
         logger.info("✅ Logfire configured successfully")
     except Exception as e:
-        logger.warning(f"⚠️  Logfire configuration failed: {e}")
+        logger.warning("⚠️  Logfire configuration failed: %s", e)
         logger.warning("⚠️  Continuing without Logfire...")
         # Disable Logfire to prevent crashes
         os.environ.pop('LOGFIRE_TOKEN_SRE_AGENT', None)
@@ -58,118 +102,382 @@ if langsmith_api_key:
 else:
     logger.warning("⚠️  LANGSMITH_API_KEY not set, LangSmith features will be limited")
 
+OLLAMA_LIMITS = httpx.Limits(max_connections=OLLAMA_MAX_CONNECTIONS, max_keepalive_connections=OLLAMA_MAX_KEEPALIVE)
+
+# Shared client for the Ollama calls made outside LangChain (embeddings), reusing keep-alive connections
+HTTP_CLIENT = httpx.AsyncClient(base_url=OLLAMA_URL, timeout=httpx.Timeout(60.0, connect=5.0), limits=OLLAMA_LIMITS)
+
+# Static system instructions go first and the user input last, so every call for a
+# method shares the same prompt prefix and Ollama can reuse its KV cache for it
+CHAT_SYSTEM_PROMPT = """You are an SRE (Site Reliability Engineering) AI assistant.
+You help with monitoring, troubleshooting, and maintaining system reliability.
+
+Please provide a helpful and accurate response based on SRE best practices."""
+
+ANALYZE_LOGS_SYSTEM_PROMPT = """As an SRE expert, analyze the logs you are given and provide insights.
+
+Please provide:
+1. Key issues identified
+2. Potential root causes
+3. Recommended actions
+4. Monitoring suggestions"""
+
+INCIDENT_RESPONSE_SYSTEM_PROMPT = """As an SRE expert, provide incident response guidance for the situation
+you are given.
+
+Please provide:
+1. Immediate actions to take
+2. Investigation steps
+3. Communication plan
+4. Post-incident actions
+5. Prevention measures"""
+
+MONITORING_ADVICE_SYSTEM_PROMPT = """As an SRE expert, provide monitoring and alerting advice for the system
+you are given.
+
+Please provide:
+1. Key metrics to monitor
+2. Alert thresholds
+3. Dashboard recommendations
+4. Log analysis strategies
+5. Performance monitoring"""
+
+def _system_first_prompt(system_prompt: str, human_template: str) -> ChatPromptTemplate:
+    """Build a prompt with fixed system instructions followed by the templated user message"""
+    return ChatPromptTemplate.from_messages([
+        SystemMessage(content=system_prompt),
+        HumanMessagePromptTemplate.from_template(human_template),
+    ])
+
+CHAT_PROMPT = _system_first_prompt(CHAT_SYSTEM_PROMPT, "User question: {question}")
+ANALYZE_LOGS_PROMPT = _system_first_prompt(ANALYZE_LOGS_SYSTEM_PROMPT, "Logs:\n{logs}")
+INCIDENT_RESPONSE_PROMPT = _system_first_prompt(INCIDENT_RESPONSE_SYSTEM_PROMPT, "Incident: {incident}")
+MONITORING_ADVICE_PROMPT = _system_first_prompt(MONITORING_ADVICE_SYSTEM_PROMPT, "System: {system}")
+
+# Fingerprint the static prefixes so a changed prompt (and a cold KV cache) shows up in the logs
+for _name, _system_prompt in [
+    ("chat", CHAT_SYSTEM_PROMPT),
+    ("analyze_logs", ANALYZE_LOGS_SYSTEM_PROMPT),
+    ("incident_response", INCIDENT_RESPONSE_SYSTEM_PROMPT),
+    ("monitoring_advice", MONITORING_ADVICE_SYSTEM_PROMPT),
+]:
+    _digest = hashlib.blake2b(_system_prompt.encode(), digest_size=8).hexdigest()
+    logger.info("🔑 %s system prompt prefix: %s", _name, _digest)
+
 # Initialize Ollama LLM
 try:
     llm = OllamaLLM(
         model=MODEL_NAME,
         base_url=OLLAMA_URL,
-        temperature=0.7,
-        top_p=0.9,
-        num_ctx=4096,
-        num_predict=1000
+        temperature=OLLAMA_TEMPERATURE,
+        top_p=OLLAMA_TOP_P,
+        num_ctx=OLLAMA_NUM_CTX,
+        num_predict=OLLAMA_NUM_PREDICT,
+        keep_alive=OLLAMA_KEEP_ALIVE,
+        # Sizes the pooled httpx client OllamaLLM keeps for the lifetime of the process
+        client_kwargs={
+            "timeout": httpx.Timeout(OLLAMA_TIMEOUT, connect=5.0),
+            "limits": OLLAMA_LIMITS,
+        }
     )
-    logger.info(f"✅ Ollama connection established: {OLLAMA_URL}")
+    logger.info("✅ Ollama connection established: %s", OLLAMA_URL)
 except Exception as e:
-    logger.error(f"❌ Error connecting to Ollama: {e}")
+    logger.error("❌ Error connecting to Ollama: %s", e)
     llm = None
 
+# Timestamp string cache; callers see the same string until TIMESTAMP_REFRESH seconds of loop time pass
+TIMESTAMP_REFRESH = 0.05
+_TS_CACHE = {"t": 0.0, "s": ""}
+
+def _now_iso() -> str:
+    """Return the current ISO timestamp, reformatted at most once per TIMESTAMP_REFRESH seconds"""
+    t = asyncio.get_running_loop().time()
+    if t - _TS_CACHE["t"] >= TIMESTAMP_REFRESH or not _TS_CACHE["s"]:
+        _TS_CACHE["t"] = t
+        _TS_CACHE["s"] = datetime.now().isoformat()
+    return _TS_CACHE["s"]
+
+def _truncate_logs(logs: str, max_tokens: int = LOGS_MAX_TOKENS) -> str:
+    """Keep the head and tail of logs that would not fit max_tokens (estimated at ~4 characters per token)"""
+    if len(logs) // 4 <= max_tokens:
+        return logs
+    # Half the budget each for the start (first errors) and the end (latest state)
+    keep = max_tokens * 2
+    omitted = len(logs) - 2 * keep
+    return f"{logs[:keep]}\n...[{omitted} characters truncated]...\n{logs[-keep:]}"
+
+def _cache_key(method_name: str, text: str) -> bytes:
+    """Hash an SRE method and its input into a response cache key"""
+    return hashlib.blake2b(f"{method_name}\0{text}".encode(), digest_size=16).digest()
+
+class SemanticIndex:
+    """Fixed-size ring of unit-length prompt embeddings, searched with one matrix-vector product"""
+    
+    def __init__(self, size: int = SEMANTIC_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self._size = size
+        self._ttl = ttl
+        # Allocated on first insert, once the embedding dimension is known
+        self._matrix: Optional[np.ndarray] = None
+        # Per row: monotonic expiry (0 for an empty row), method id and cached response
+        self._expires = np.zeros(size)
+        self._methods = np.full(size, -1, dtype=np.int16)
+        self._responses: List[Optional[str]] = [None] * size
+        self._method_ids: Dict[str, int] = {}
+        self._next = 0
+    
+    def add(self, method_name: str, embedding: np.ndarray, response: str):
+        """Store response under embedding, overwriting the oldest row when full"""
+        if not self._size:
+            return
+        if self._matrix is None or self._matrix.shape[1] != embedding.shape[0]:
+            # A different embedding model invalidates every stored row
+            self._matrix = np.zeros((self._size, embedding.shape[0]), dtype=np.float32)
+            self._expires[:] = 0
+        row = self._next
+        self._next = (row + 1) % self._size
+        self._matrix[row] = embedding
+        self._expires[row] = time.monotonic() + self._ttl
+        self._methods[row] = self._method_ids.setdefault(method_name, len(self._method_ids))
+        self._responses[row] = response
+    
+    def lookup(self, method_name: str, embedding: np.ndarray, threshold: float) -> Optional[str]:
+        """Return the live response for method_name most similar to embedding, if at least threshold"""
+        method_id = self._method_ids.get(method_name)
+        if method_id is None or not self._size or self._matrix is None or self._matrix.shape[1] != embedding.shape[0]:
+            return None
+        # Rows are normalized, so the products are cosine similarities
+        scores = self._matrix @ embedding
+        scores[(self._methods != method_id) | (self._expires <= time.monotonic())] = -np.inf
+        row = int(np.argmax(scores))
+        return self._responses[row] if scores[row] >= threshold else None
+    
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires > time.monotonic()))
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into batched Ollama /api/embed calls"""
+    
+    def __init__(self, model: str, max_batch: int = EMBED_BATCH_SIZE, max_wait: float = EMBED_BATCH_WAIT):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def submit(self, text: str) -> List[float]:
+        """Queue text for the next batch and wait for its embedding"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+    
+    async def _run(self):
+        """Collect up to max_batch texts or until max_wait has passed, then embed them in one call"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch(batch)
+    
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Send one /api/embed request for the batch and resolve each caller's future"""
+        try:
+            payload = {"model": self.model, "input": [text for text, _ in batch]}
+            resp = await HTTP_CLIENT.post(
+                "/api/embed", content=orjson.dumps(payload), headers={"Content-Type": "application/json"}
+            )
+            resp.raise_for_status()
+            embeddings = orjson.loads(resp.content)["embeddings"]
+            if len(embeddings) != len(batch):
+                raise ValueError(f"expected {len(batch)} embeddings, got {len(embeddings)}")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), embedding in zip(batch, embeddings):
+            # Callers that gave up (cancelled requests) are skipped
+            if not future.done():
+                future.set_result(embedding)
+    
+    async def close(self):
+        """Stop the batching task"""
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
 class SREAgent:
     """SRE Agent Core Class"""
     
     def __init__(self):
         self.llm = llm
         self.service_name = SERVICE_NAME
+        self._cache: TTLCache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        # Unit-length prompt embeddings with their responses
+        self._semantic_cache = SemanticIndex()
+        self._cache_stats = {"hits": 0, "semantic_hits": 0, "misses": 0}
+        self._embedder = EmbeddingBatcher(SEMANTIC_CACHE_MODEL) if SEMANTIC_CACHE_MODEL else None
+        # Compose the chains once; the request path only invokes them
+        self._chat_chain = CHAT_PROMPT | self._tuned_llm(INFER_PARAMS_CHAT) if self.llm else None
+        self._logs_chain = ANALYZE_LOGS_PROMPT | self._tuned_llm(INFER_PARAMS_ANALYZE) if self.llm else None
+        self._incident_chain = INCIDENT_RESPONSE_PROMPT | self._tuned_llm(INFER_PARAMS_INCIDENT) if self.llm else None
+        self._monitoring_chain = MONITORING_ADVICE_PROMPT | self._tuned_llm(INFER_PARAMS_MONITOR) if self.llm else None
+        # Method name -> (chain, prompt variable), for streaming callers
+        self._chains = {
+            "chat": (self._chat_chain, "question"),
+            "analyze_logs": (self._logs_chain, "logs"),
+            "incident_response": (self._incident_chain, "incident"),
+            "monitoring_advice": (self._monitoring_chain, "system"),
+        }
+    
+    def _tuned_llm(self, params):
+        """Bind sampling overrides onto the shared LLM, which keeps a single pooled Ollama client"""
+        # OllamaLLM swaps in the bound options wholesale and then writes "stop" into them on every
+        # call, so each profile gets its own dict, built from the settings above, with stop pinned
+        return self.llm.bind(options={
+            "num_ctx": OLLAMA_NUM_CTX,
+            "num_predict": OLLAMA_NUM_PREDICT,
+            "temperature": OLLAMA_TEMPERATURE,
+            "top_p": OLLAMA_TOP_P,
+            **params,
+            "stop": None,
+        })
+    
+    async def _cached_invoke(
+        self, method_name: str, key_text: str, chain, inputs: Dict[str, Any], cache: bool = True
+    ) -> str:
+        """Invoke the chain, answering repeated (or, with SEMANTIC_CACHE_MODEL, similar) prompts from cache"""
+        if not cache:
+            return await chain.ainvoke(inputs)
         
+        key = _cache_key(method_name, key_text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache_stats["hits"] += 1
+            return cached
+        
+        embedding = await self._embed(key_text) if self._embedder else None
+        if embedding is not None:
+            cached = self._semantic_cache.lookup(method_name, embedding, SEMANTIC_CACHE_THRESHOLD)
+            if cached is not None:
+                self._cache_stats["semantic_hits"] += 1
+                return cached
+        
+        self._cache_stats["misses"] += 1
+        response = await chain.ainvoke(inputs)
+        if isinstance(response, str) and response:
+            self._cache[key] = response
+            if embedding is not None:
+                self._semantic_cache.add(method_name, embedding, response)
+        return response
+    
+    async def astream(self, method_name: str, text: str) -> AsyncIterator[str]:
+        """Yield the response of an SRE method in chunks as Ollama generates it"""
+        if not self.llm:
+            yield "Error: Ollama connection not available"
+            return
+        
+        if method_name == "analyze_logs":
+            text = _truncate_logs(text)
+        key = _cache_key(method_name, text)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache_stats["hits"] += 1
+            yield cached
+            return
+        
+        self._cache_stats["misses"] += 1
+        chain, variable = self._chains[method_name]
+        chunks = []
+        async for chunk in chain.astream({variable: text}):
+            # Ollama closes the stream with an empty chunk; don't send a frame for it
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            yield chunk
+        # Only a fully streamed response is cached
+        response = "".join(chunks)
+        if response:
+            self._cache[key] = response
+    
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Return the unit-length Ollama embedding of text, or None if it cannot be computed"""
+        try:
+            vector = np.asarray(await self._embedder.submit(text), dtype=np.float32)
+        except Exception as e:
+            logger.warning("⚠️  Semantic cache embedding failed: %s", e)
+            return None
+        norm = float(np.linalg.norm(vector)) or 1.0
+        return vector / norm
+    
+    def cache_info(self) -> Dict[str, Any]:
+        """Return response cache size and hit counters"""
+        return {
+            "entries": len(self._cache),
+            "semantic_entries": len(self._semantic_cache),
+            "semantic_enabled": self._embedder is not None,
+            **self._cache_stats,
+        }
+        
+    async def close(self):
+        """Release background resources"""
+        if self._embedder is not None:
+            await self._embedder.close()
+    
     @traceable(name="sre_chat", run_type="chain")
     @logfire.instrument("sre_chat")
-    async def chat(self, message: str) -> str:
+    async def chat(self, message: str, cache: bool = True) -> str:
         """Handle general SRE chat requests"""
         if not self.llm:
             return "Error: Ollama connection not available"
         
-        prompt = ChatPromptTemplate.from_template("""
-        You are an SRE (Site Reliability Engineering) AI assistant. 
-        You help with monitoring, troubleshooting, and maintaining system reliability.
-        
-        User question: {question}
-        
-        Please provide a helpful and accurate response based on SRE best practices.
-        """)
-        
-        chain = prompt | self.llm
-        response = chain.invoke({"question": message})
+        response = await self._cached_invoke("chat", message, self._chat_chain, {"question": message}, cache=cache)
         return response
     
     @traceable(name="sre_analyze_logs", run_type="chain")
     @logfire.instrument("analyze_logs")
-    async def analyze_logs(self, logs: str) -> str:
+    async def analyze_logs(self, logs: str, cache: bool = True) -> str:
         """Analyze logs for SRE insights"""
         if not self.llm:
             return "Error: Ollama connection not available"
         
-        prompt = ChatPromptTemplate.from_template("""
-        As an SRE expert, analyze the following logs and provide insights:
-        
-        Logs:
-        {logs}
-        
-        Please provide:
-        1. Key issues identified
-        2. Potential root causes
-        3. Recommended actions
-        4. Monitoring suggestions
-        """)
-        
-        chain = prompt | self.llm
-        analysis = chain.invoke({"logs": logs})
+        logs = _truncate_logs(logs)
+        analysis = await self._cached_invoke("analyze_logs", logs, self._logs_chain, {"logs": logs}, cache=cache)
         return analysis
     
     @traceable(name="sre_incident_response", run_type="chain")
     @logfire.instrument("incident_response")
-    async def incident_response(self, incident: str) -> str:
+    async def incident_response(self, incident: str, cache: bool = True) -> str:
         """Provide incident response guidance"""
         if not self.llm:
             return "Error: Ollama connection not available"
         
-        prompt = ChatPromptTemplate.from_template("""
-        As an SRE expert, provide incident response guidance for the following situation:
-        
-        Incident: {incident}
-        
-        Please provide:
-        1. Immediate actions to take
-        2. Investigation steps
-        3. Communication plan
-        4. Post-incident actions
-        5. Prevention measures
-        """)
-        
-        chain = prompt | self.llm
-        response = chain.invoke({"incident": incident})
+        response = await self._cached_invoke(
+            "incident_response", incident, self._incident_chain, {"incident": incident}, cache=cache
+        )
         return response
     
     @traceable(name="sre_monitoring_advice", run_type="chain")
     @logfire.instrument("monitoring_advice")
-    async def monitoring_advice(self, system: str) -> str:
+    async def monitoring_advice(self, system: str, cache: bool = True) -> str:
         """Provide monitoring and alerting advice"""
         if not self.llm:
             return "Error: Ollama connection not available"
         
-        prompt = ChatPromptTemplate.from_template("""
-        As an SRE expert, provide monitoring and alerting advice for the following system:
-        
-        System: {system}
-        
-        Please provide:
-        1. Key metrics to monitor
-        2. Alert thresholds
-        3. Dashboard recommendations
-        4. Log analysis strategies
-        5. Performance monitoring
-        """)
-        
-        chain = prompt | self.llm
-        advice = chain.invoke({"system": system})
+        advice = await self._cached_invoke(
+            "monitoring_advice", system, self._monitoring_chain, {"system": system}, cache=cache
+        )
         return advice
     
     @logfire.instrument("health_check")
@@ -178,137 +486,131 @@ class SREAgent:
         return {
             "status": "healthy",
             "service": self.service_name,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "ollama_url": OLLAMA_URL,
             "model_name": MODEL_NAME,
-            "llm_connected": self.llm is not None
+            "llm_connected": self.llm is not None,
+            "cache": self.cache_info()
         }
 
 # Global agent instance
 agent = SREAgent()
+AGENT_KEY = web.AppKey("agent", SREAgent)
+
+# /health bodies are reused for HEALTH_CACHE_TTL seconds to keep frequent probes cheap
+HEALTH_CACHE_TTL = float(os.environ.get("HEALTH_CACHE_TTL", "1.0"))
+_HEALTH_CACHE = {"t": 0.0, "body": b""}
+
+# Readiness only depends on whether the Ollama client was created, so both answers are encoded once
+_READY_BODY = orjson.dumps({"status": "ready", "service": SERVICE_NAME})
+_NOT_READY_BODY = orjson.dumps({"status": "not_ready", "error": "Ollama connection not available"})
+
+# JSON replies at least this large (LLM output, log analyses) are gzipped for clients that accept it
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+
+def json_response(data: Any, status: int = 200) -> Response:
+    """Build a JSON response encoded with orjson"""
+    return web.Response(body=orjson.dumps(data), status=status, content_type="application/json")
+
+@web.middleware
+async def compress_large_responses(request: Request, handler) -> web.StreamResponse:
+    """Gzip large buffered JSON replies when the client accepts gzip"""
+    response = await handler(request)
+    if (
+        isinstance(response, web.Response)
+        and response.body is not None
+        and len(response.body) >= COMPRESS_MIN_SIZE
+        and "gzip" in request.headers.get("Accept-Encoding", "")
+    ):
+        response.enable_compression(web.ContentCoding.gzip)
+    return response
 
 async def health_handler(request: Request) -> Response:
     """Health check endpoint"""
-    health_status = await agent.health_check()
-    return web.json_response(health_status)
+    now = asyncio.get_running_loop().time()
+    if not _HEALTH_CACHE["body"] or now - _HEALTH_CACHE["t"] >= HEALTH_CACHE_TTL:
+        _HEALTH_CACHE["body"] = orjson.dumps(await request.app[AGENT_KEY].health_check())
+        _HEALTH_CACHE["t"] = now
+    return web.Response(body=_HEALTH_CACHE["body"], content_type="application/json")
 
 async def ready_handler(request: Request) -> Response:
     """Readiness check endpoint"""
-    if agent.llm:
-        return web.json_response({"status": "ready", "service": SERVICE_NAME})
+    if request.app[AGENT_KEY].llm:
+        return web.Response(body=_READY_BODY, content_type="application/json")
     else:
-        return web.json_response(
-            {"status": "not_ready", "error": "Ollama connection not available"},
-            status=503
-        )
+        return web.Response(body=_NOT_READY_BODY, status=503, content_type="application/json")
 
-async def chat_handler(request: Request) -> Response:
-    """Chat endpoint for SRE agent"""
-    try:
-        data = await request.json()
-        message = data.get("message", "")
-        
-        if not message:
-            return web.json_response(
-                {"error": "Message is required"},
-                status=400
-            )
-        
-        response = await agent.chat(message)
-        return web.json_response({
-            "response": response,
-            "service": SERVICE_NAME,
-            "timestamp": datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        logger.error(f"Error in chat handler: {e}")
-        return web.json_response(
-            {"error": str(e)},
-            status=500
-        )
+_SSE_DATA = b"data: %s\n\n"
+# Per-chunk and closing frames are filled by a single bytes %-format; only the variable parts get encoded
+_SSE_DELTA_TMPL = b'data: {"delta":%s}\n\n'
+_SSE_DONE_TMPL = b'data: {"done":true,"service":%s,"timestamp":"%%s"}\n\n' % orjson.dumps(SERVICE_NAME).replace(b"%", b"%%")
 
-async def analyze_logs_handler(request: Request) -> Response:
-    """Log analysis endpoint"""
+async def _stream_response(request: Request, method_name: str, value: str) -> web.StreamResponse:
+    """Send an SRE method's output as server-sent events while it is generated"""
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
     try:
-        data = await request.json()
-        logs = data.get("logs", "")
-        
-        if not logs:
-            return web.json_response(
-                {"error": "Logs are required"},
-                status=400
-            )
-        
-        analysis = await agent.analyze_logs(logs)
-        return web.json_response({
-            "analysis": analysis,
-            "service": SERVICE_NAME,
-            "timestamp": datetime.now().isoformat()
-        })
-    
+        async for chunk in request.app[AGENT_KEY].astream(method_name, value):
+            await response.write(_SSE_DELTA_TMPL % orjson.dumps(chunk))
+        await response.write(_SSE_DONE_TMPL % _now_iso().encode())
+    except ConnectionResetError:
+        # Client went away; stop generating for it
+        return response
     except Exception as e:
-        logger.error(f"Error in analyze_logs handler: {e}")
-        return web.json_response(
-            {"error": str(e)},
-            status=500
-        )
+        logger.error("Error streaming %s: %s", method_name, e)
+        await response.write(_SSE_DATA % orjson.dumps({"error": str(e)}))
+    await response.write_eof()
+    return response
 
-async def incident_response_handler(request: Request) -> Response:
-    """Incident response endpoint"""
-    try:
-        data = await request.json()
-        incident = data.get("incident", "")
-        
-        if not incident:
-            return web.json_response(
-                {"error": "Incident description is required"},
-                status=400
-            )
-        
-        response = await agent.incident_response(incident)
-        return web.json_response({
-            "response": response,
-            "service": SERVICE_NAME,
-            "timestamp": datetime.now().isoformat()
-        })
-    
-    except Exception as e:
-        logger.error(f"Error in incident_response handler: {e}")
-        return web.json_response(
-            {"error": str(e)},
-            status=500
-        )
+Handler = Callable[[Request], Awaitable[web.StreamResponse]]
 
-async def monitoring_advice_handler(request: Request) -> Response:
-    """Monitoring advice endpoint"""
-    try:
-        data = await request.json()
-        system = data.get("system", "")
+def make_handler(field: str, method_name: str, response_key: str, missing_error: str, description: str) -> Handler:
+    """Build a POST handler that passes the request's field to an SREAgent method"""
+    async def handler(request: Request) -> web.StreamResponse:
+        try:
+            data = orjson.loads(await request.read())
+            value = data.get(field, "")
+            
+            if not value:
+                return json_response(
+                    {"error": missing_error},
+                    status=400
+                )
+            
+            if data.get("stream"):
+                return await _stream_response(request, method_name, value)
+            
+            result = await getattr(request.app[AGENT_KEY], method_name)(value)
+            return json_response({
+                response_key: result,
+                "service": SERVICE_NAME,
+                "timestamp": _now_iso()
+            })
         
-        if not system:
-            return web.json_response(
-                {"error": "System description is required"},
-                status=400
+        except Exception as e:
+            logger.error("Error in %s handler: %s", method_name, e)
+            return json_response(
+                {"error": str(e)},
+                status=500
             )
-        
-        advice = await agent.monitoring_advice(system)
-        return web.json_response({
-            "advice": advice,
-            "service": SERVICE_NAME,
-            "timestamp": datetime.now().isoformat()
-        })
     
-    except Exception as e:
-        logger.error(f"Error in monitoring_advice handler: {e}")
-        return web.json_response(
-            {"error": str(e)},
-            status=500
-        )
+    handler.__name__ = f"{method_name}_handler"
+    handler.__doc__ = description
+    return handler
+
+chat_handler = make_handler("message", "chat", "response", "Message is required", "Chat endpoint for SRE agent")
+analyze_logs_handler = make_handler("logs", "analyze_logs", "analysis", "Logs are required", "Log analysis endpoint")
+incident_response_handler = make_handler(
+    "incident", "incident_response", "response", "Incident description is required", "Incident response endpoint"
+)
+monitoring_advice_handler = make_handler(
+    "system", "monitoring_advice", "advice", "System description is required", "Monitoring advice endpoint"
+)
 
 async def start_http_server():
     """Start the HTTP server"""
-    app = web.Application()
+    app = web.Application(middlewares=[compress_large_responses])
+    app[AGENT_KEY] = agent
     
     # Add routes
     app.router.add_get('/health', health_handler)
@@ -317,43 +619,68 @@ async def start_http_server():
     app.router.add_post('/analyze-logs', analyze_logs_handler)
     app.router.add_post('/incident-response', incident_response_handler)
     app.router.add_post('/monitoring-advice', monitoring_advice_handler)
+    setup_profiling(app)
     
     # Start server
     runner = web.AppRunner(app)
     await runner.setup()
-    site = web.TCPSite(runner, '0.0.0.0', 8080)
+    # With reuse_port every WEB_WORKERS process binds 8080 and the kernel spreads connections across them
+    site = web.TCPSite(runner, '0.0.0.0', 8080, reuse_port=True)
     await site.start()
     
     logger.info("🌐 HTTP server started on port 8080")
     return runner
 
+def install_stop_handlers() -> asyncio.Event:
+    """Return an event that is set on SIGINT/SIGTERM (Kubernetes sends SIGTERM on pod shutdown)"""
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    return stop
+
+async def cancel_pending_tasks():
+    """Cancel every other task on the loop and wait for them to unwind"""
+    tasks = asyncio.all_tasks() - {asyncio.current_task()}
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if tasks:
+        logger.info("Cancelled %d pending tasks", len(tasks))
+
 async def main():
     """Main function for running the agent"""
-    logger.info(f"Starting {SERVICE_NAME} Agent")
-    logger.info(f"Ollama URL: {OLLAMA_URL}")
-    logger.info(f"Model: {MODEL_NAME}")
+    logger.info("Starting %s Agent", SERVICE_NAME)
+    logger.info("Ollama URL: %s", OLLAMA_URL)
+    logger.info("Model: %s", MODEL_NAME)
+    logger.info("Event loop: %s", type(asyncio.get_running_loop()).__module__)
     
-    # Test the agent
+    # Test the agent; only the first worker asks, so N workers don't run N generations at boot
     if agent.llm:
         logger.info("✅ Agent initialized successfully")
-        logger.info("Testing agent with sample question...")
-        response = await agent.chat("How do I monitor Kubernetes pods?")
-        logger.info(f"🤖 Agent Response: {response}")
+        if workers.WORKER_INDEX == 0:
+            logger.info("Testing agent with sample question...")
+            response = await agent.chat("How do I monitor Kubernetes pods?")
+            logger.info("🤖 Agent Response: %s", response)
     else:
         logger.error("❌ Agent not available - Ollama connection failed")
         return
     
     # Start HTTP server
     http_runner = await start_http_server()
+    stop = install_stop_handlers()
     
     try:
-        # Keep the server running
+        # Keep the server running until SIGINT/SIGTERM
         logger.info("🏁 SRE Agent is running...")
-        await asyncio.Event().wait()  # Run forever
-    except KeyboardInterrupt:
+        await stop.wait()
         logger.info("🛑 Shutting down...")
     finally:
+        # In-flight LLM calls are cancelled rather than left to run out the termination grace period
+        await cancel_pending_tasks()
         await http_runner.cleanup()
+        await agent.close()
+        await HTTP_CLIENT.aclose()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    workers.serve(main, WEB_WORKERS)
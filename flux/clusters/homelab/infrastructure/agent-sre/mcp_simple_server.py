@@ -5,23 +5,121 @@ No external dependencies beyond what's already available
 """
 
 import os
-import json
+import orjson
 import asyncio
 import logging
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 from aiohttp import web
 from aiohttp.web import Request, Response
 
 # Import the SRE agent from main.py
-from main import agent, logger
+from main import agent, logger, json_response, compress_large_responses, _now_iso
+from main import install_stop_handlers, cancel_pending_tasks, HTTP_CLIENT, WEB_WORKERS
+from loop_profiler import setup_profiling
+from workers import serve
+
+_TOOLS = [
+    {
+        "name": "sre_chat",
+        "description": "General SRE chat and consultation",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "message": {
+                    "type": "string",
+                    "description": "Your SRE question or request"
+                }
+            },
+            "required": ["message"]
+        }
+    },
+    {
+        "name": "analyze_logs",
+        "description": "Analyze logs for SRE insights",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "logs": {
+                    "type": "string",
+                    "description": "Log data to analyze"
+                }
+            },
+            "required": ["logs"]
+        }
+    },
+    {
+        "name": "health_check",
+        "description": "Check the health status",
+        "inputSchema": {
+            "type": "object",
+            "properties": {}
+        }
+    }
+]
+
+# Constant JSON-RPC replies, encoded once with a placeholder id that is patched per request
+_ID_PLACEHOLDER = b'"__ID__"'
+_TOOLS_LIST_TMPL = orjson.dumps({"jsonrpc": "2.0", "id": "__ID__", "result": {"tools": _TOOLS}})
+_INITIALIZE_TMPL = orjson.dumps({
+    "jsonrpc": "2.0",
+    "id": "__ID__",
+    "result": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {
+            "tools": {}
+        },
+        "serverInfo": {
+            "name": "sre-agent-simple-mcp",
+            "version": "1.0.0"
+        }
+    }
+})
+
+# SSE stream shape: one connected event, then a fixed number of heartbeats
+SSE_HEARTBEATS = 10
+SSE_HEARTBEAT_INTERVAL = 5
+_SSE_CONNECT_TMPL = b'data: {"type": "connected", "timestamp": "%s"}\n\n'
+
+# Probe replies; the liveness body only varies by its timestamp
+_HEALTH_TMPL = orjson.dumps({
+    "status": "healthy",
+    "service": "sre-agent-mcp",
+    "timestamp": "__TS__",
+    "uptime": "running",
+    "version": "1.0.0"
+}).replace(b"%", b"%%").replace(b'"__TS__"', b'"%s"')
+_NOT_INITIALIZED_BODY = orjson.dumps({"status": "not_ready", "reason": "SRE agent not initialized"})
+_OLLAMA_UNAVAILABLE_BODY = orjson.dumps({"status": "not_ready", "reason": "Ollama connection not available"})
+_MCP_ENDPOINTS = ["/mcp", "/health", "/ready", "/sse"]
+
+def _with_id(template: bytes, request_id: Any) -> bytes:
+    """Fill the request id into a pre-encoded JSON-RPC reply."""
+    return template.replace(_ID_PLACEHOLDER, orjson.dumps(request_id), 1)
+
+def _json_body(body: bytes, status: int = 200) -> Response:
+    """Build a JSON response from already-encoded bytes."""
+    return web.Response(body=body, status=status, content_type="application/json")
 
 class SimpleMCPServer:
     """Simple MCP Server that actually works."""
     
     def __init__(self):
         self.sre_agent = agent
-        self.app = web.Application()
+        self.app = web.Application(middlewares=[compress_large_responses])
+        self._info_body = orjson.dumps({
+            "name": "sre-agent-simple-mcp",
+            "version": "1.0.0",
+            "description": "Simple SRE Agent MCP Server",
+            "protocol": "mcp",
+            "capabilities": {
+                "tools": True,
+                "resources": False,
+                "prompts": False
+            }
+        })
+        self._heartbeat_frames = tuple(
+            b'data: {"type": "heartbeat", "count": %d}\n\n' % i for i in range(SSE_HEARTBEATS)
+        )
         self._setup_routes()
     
     def _setup_routes(self):
@@ -36,33 +134,26 @@ class SimpleMCPServer:
         # Add route for mcp with query parameters (for mcp-remote compatibility)
         self.app.router.add_post('/mcp/', self.handle_mcp_request)
         self.app.router.add_get('/mcp/', self.handle_mcp_info)
+        
+        # Debug-only loop profiler (ENABLE_PROFILE)
+        setup_profiling(self.app)
     
     async def handle_mcp_info(self, request: Request) -> Response:
         """Handle GET requests."""
-        return web.json_response({
-            "name": "sre-agent-simple-mcp",
-            "version": "1.0.0",
-            "description": "Simple SRE Agent MCP Server",
-            "protocol": "mcp",
-            "capabilities": {
-                "tools": True,
-                "resources": False,
-                "prompts": False
-            }
-        })
+        return _json_body(self._info_body)
     
     async def handle_mcp_request(self, request: Request) -> Response:
         """Handle MCP JSON-RPC 2.0 requests."""
         try:
-            data = await request.json()
+            data = orjson.loads(await request.read())
             
             # Handle notifications (no id field)
             if 'method' in data and 'id' not in data:
                 method = data.get('method')
                 if method == 'notifications/initialized':
-                    return web.json_response({})  # Empty response for notifications
+                    return json_response({})  # Empty response for notifications
                 else:
-                    return web.json_response({})  # Empty response for other notifications
+                    return json_response({})  # Empty response for other notifications
             
             if 'method' in data and 'id' in data:
                 method = data.get('method')
@@ -70,75 +161,17 @@ class SimpleMCPServer:
                 request_id = data.get('id')
                 
                 if method == 'initialize':
-                    return web.json_response({
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "protocolVersion": "2024-11-05",
-                            "capabilities": {
-                                "tools": {}
-                            },
-                            "serverInfo": {
-                                "name": "sre-agent-simple-mcp",
-                                "version": "1.0.0"
-                            }
-                        }
-                    })
+                    return _json_body(_with_id(_INITIALIZE_TMPL, request_id))
                 
                 elif method == 'tools/list':
-                    tools = [
-                        {
-                            "name": "sre_chat",
-                            "description": "General SRE chat and consultation",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "message": {
-                                        "type": "string",
-                                        "description": "Your SRE question or request"
-                                    }
-                                },
-                                "required": ["message"]
-                            }
-                        },
-                        {
-                            "name": "analyze_logs",
-                            "description": "Analyze logs for SRE insights",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {
-                                    "logs": {
-                                        "type": "string",
-                                        "description": "Log data to analyze"
-                                    }
-                                },
-                                "required": ["logs"]
-                            }
-                        },
-                        {
-                            "name": "health_check",
-                            "description": "Check the health status",
-                            "inputSchema": {
-                                "type": "object",
-                                "properties": {}
-                            }
-                        }
-                    ]
-                    
-                    return web.json_response({
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "tools": tools
-                        }
-                    })
+                    return _json_body(_with_id(_TOOLS_LIST_TMPL, request_id))
                 
                 elif method == 'tools/call':
                     tool_name = params.get('name')
                     arguments = params.get('arguments', {})
                     
                     if not tool_name:
-                        return web.json_response({
+                        return json_response({
                             "jsonrpc": "2.0",
                             "id": request_id,
                             "error": {
@@ -148,7 +181,7 @@ class SimpleMCPServer:
                         })
                     
                     result = await self._execute_tool(tool_name, arguments)
-                    return web.json_response({
+                    return json_response({
                         "jsonrpc": "2.0",
                         "id": request_id,
                         "result": {
@@ -162,7 +195,7 @@ class SimpleMCPServer:
                     })
                 
                 else:
-                    return web.json_response({
+                    return json_response({
                         "jsonrpc": "2.0",
                         "id": request_id,
                         "error": {
@@ -172,7 +205,7 @@ class SimpleMCPServer:
                     })
             
             else:
-                return web.json_response({
+                return json_response({
                     "jsonrpc": "2.0",
                     "error": {
                         "code": -32700,
@@ -181,8 +214,8 @@ class SimpleMCPServer:
                 }, status=400)
                 
         except Exception as e:
-            logger.error(f"Error handling MCP request: {e}")
-            return web.json_response({
+            logger.error("Error handling MCP request: %s", e)
+            return json_response({
                 "jsonrpc": "2.0",
                 "error": {
                     "code": -32603,
@@ -209,30 +242,23 @@ class SimpleMCPServer:
             
             elif name == "health_check":
                 health = await self.sre_agent.health_check()
-                return json.dumps(health, indent=2)
+                return orjson.dumps(health, option=orjson.OPT_INDENT_2).decode()
             
             else:
                 return f"❌ Unknown tool: {name}"
         
         except Exception as e:
-            logger.error(f"Error executing tool {name}: {e}")
+            logger.error("Error executing tool %s: %s", name, e)
             return f"Error executing tool {name}: {str(e)}"
     
     async def handle_health(self, request: Request) -> Response:
         """Liveness probe endpoint - checks if the service is alive."""
         try:
             # Basic health check - just verify the service is responding
-            health_status = {
-                "status": "healthy",
-                "service": "sre-agent-mcp",
-                "timestamp": datetime.now().isoformat(),
-                "uptime": "running",
-                "version": "1.0.0"
-            }
-            return web.json_response(health_status)
+            return _json_body(_HEALTH_TMPL % _now_iso().encode())
         except Exception as e:
-            logger.error(f"Health check failed: {e}")
-            return web.json_response(
+            logger.error("Health check failed: %s", e)
+            return json_response(
                 {"status": "unhealthy", "error": str(e)}, 
                 status=503
             )
@@ -242,33 +268,27 @@ class SimpleMCPServer:
         try:
             # Check if the SRE agent is properly initialized
             if not self.sre_agent or not self.sre_agent.llm:
-                return web.json_response(
-                    {"status": "not_ready", "reason": "SRE agent not initialized"}, 
-                    status=503
-                )
+                return _json_body(_NOT_INITIALIZED_BODY, status=503)
             
             # Perform a more comprehensive readiness check
             health_status = await self.sre_agent.health_check()
             
             # Check if Ollama connection is working
             if not health_status.get("llm_connected", False):
-                return web.json_response(
-                    {"status": "not_ready", "reason": "Ollama connection not available"}, 
-                    status=503
-                )
+                return _json_body(_OLLAMA_UNAVAILABLE_BODY, status=503)
             
             readiness_status = {
                 "status": "ready",
                 "service": "sre-agent-mcp",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now_iso(),
                 "agent_status": health_status,
-                "mcp_endpoints": ["/mcp", "/health", "/ready", "/sse"]
+                "mcp_endpoints": _MCP_ENDPOINTS
             }
-            return web.json_response(readiness_status)
+            return json_response(readiness_status)
             
         except Exception as e:
-            logger.error(f"Readiness check failed: {e}")
-            return web.json_response(
+            logger.error("Readiness check failed: %s", e)
+            return json_response(
                 {"status": "not_ready", "error": str(e)}, 
                 status=503
             )
@@ -284,17 +304,15 @@ class SimpleMCPServer:
         
         try:
             # Send initial event
-            await response.write(b"data: {\"type\": \"connected\", \"timestamp\": \"" + 
-                               datetime.now().isoformat().encode() + b"\"}\n\n")
+            await response.write(_SSE_CONNECT_TMPL % _now_iso().encode())
             
-            # Send heartbeat every 5 seconds
-            for i in range(10):  # Send 10 heartbeats
-                await asyncio.sleep(5)
-                await response.write(b"data: {\"type\": \"heartbeat\", \"count\": " + 
-                                   str(i).encode() + b"}\n\n")
+            # Send a heartbeat every SSE_HEARTBEAT_INTERVAL seconds
+            for frame in self._heartbeat_frames:
+                await asyncio.sleep(SSE_HEARTBEAT_INTERVAL)
+                await response.write(frame)
                 
         except Exception as e:
-            logger.error(f"SSE error: {e}")
+            logger.error("SSE error: %s", e)
         finally:
             await response.write_eof()
         
@@ -304,20 +322,21 @@ class SimpleMCPServer:
         """Start the MCP server."""
         runner = web.AppRunner(self.app)
         await runner.setup()
-        site = web.TCPSite(runner, host, port)
+        site = web.TCPSite(runner, host, port, reuse_port=True)
         await site.start()
         
-        logger.info(f"🌐 Simple MCP Server started on {host}:{port}")
-        logger.info(f"📋 MCP endpoint: http://localhost:{port}/mcp")
-        logger.info(f"🏥 Health endpoint: http://localhost:{port}/health")
-        logger.info(f"✅ Readiness endpoint: http://localhost:{port}/ready")
-        logger.info(f"📡 SSE endpoint: http://localhost:{port}/sse")
+        logger.info("🌐 Simple MCP Server started on %s:%s", host, port)
+        logger.info("📋 MCP endpoint: http://localhost:%s/mcp", port)
+        logger.info("🏥 Health endpoint: http://localhost:%s/health", port)
+        logger.info("✅ Readiness endpoint: http://localhost:%s/ready", port)
+        logger.info("📡 SSE endpoint: http://localhost:%s/sse", port)
         
         return runner
 
 async def main():
     """Main entry point."""
     logger.info("🚀 Starting Simple SRE Agent MCP Server")
+    logger.info("Event loop: %s", type(asyncio.get_running_loop()).__module__)
     
     # Configure server options
     host = os.getenv("MCP_HOST", "0.0.0.0")
@@ -325,14 +344,17 @@ async def main():
     
     server = SimpleMCPServer()
     runner = await server.start_server(host, port)
+    stop = install_stop_handlers()
     
     try:
         logger.info("🏁 Simple MCP Server is running...")
-        await asyncio.Event().wait()  # Run forever
-    except KeyboardInterrupt:
+        await stop.wait()
         logger.info("🛑 Shutting down...")
     finally:
+        await cancel_pending_tasks()
         await runner.cleanup()
+        await agent.close()
+        await HTTP_CLIENT.aclose()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    serve(main, WEB_WORKERS)
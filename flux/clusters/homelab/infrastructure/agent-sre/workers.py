@@ -0,0 +1,91 @@
+"""
+Worker Supervisor
+Forks server processes that share the listen port and stops the pod when one of them dies
+"""
+
+import os
+import sys
+import signal
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Index of this process among the server workers; stays 0 when running single-process
+WORKER_INDEX = 0
+
+def run_async(entrypoint: Callable[[], Awaitable[None]]):
+    """Run entrypoint to completion, on uvloop's event loop when it is installed"""
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(entrypoint())
+
+def serve(entrypoint: Callable[[], Awaitable[None]], workers: int):
+    """Run entrypoint in `workers` forked processes sharing the listen port via SO_REUSEPORT.
+    
+    The parent only supervises: it passes SIGINT/SIGTERM on to every worker, and when a worker
+    exits on its own it stops the others and exits non-zero so Kubernetes restarts the pod
+    instead of leaving it up with fewer workers.
+    """
+    global WORKER_INDEX
+    if workers <= 1 or not hasattr(os, "fork"):
+        run_async(entrypoint)
+        return
+    
+    # Hold stop signals while forking so none arrives before the parent's handlers are in place
+    stop_signals = {signal.SIGINT, signal.SIGTERM}
+    signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+    children = {}
+    for index in range(workers):
+        # Fork before any event loop exists so every worker gets its own loop and connections
+        pid = os.fork()
+        if pid == 0:
+            WORKER_INDEX = index
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+            code = 0
+            try:
+                run_async(entrypoint)
+            except BaseException:
+                code = 1
+                logger.exception(f"Worker {index} failed")
+            finally:
+                # os._exit skips interpreter shutdown, so flush buffered log output first
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        children[pid] = index
+    
+    stopping = False
+    
+    def stop(signum=None, frame=None):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    
+    for sig in stop_signals:
+        signal.signal(sig, stop)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+    logger.info(f"👥 Started {workers} worker processes")
+    
+    failed = False
+    while children:
+        pid, status = os.wait()
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        logger.error(
+            f"Worker {index} exited unexpectedly with status {os.waitstatus_to_exitcode(status)}, "
+            "stopping the other workers"
+        )
+        failed = True
+        stop()
+    if failed:
+        sys.exit(1)
@@ -2,37 +2,185 @@
 """
 Cloudflare Tunnel Route Updater - ONE SCRIPT TO RULE THEM ALL
 Gets current service IPs and updates tunnel routes via Cloudflare API
+
+The API token is read from CF_API_TOKEN, falling back to the system keyring
+(service "cloudflare", user "api_token") when the keyring package is installed.
+Each step is traced as a Logfire span when LOGFIRE_TOKEN is set and logfire is installed.
 """
 
-import requests
+import asyncio
+import hashlib
 import json
-import subprocess
+import os
 import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+class _NoSpan:
+    """Stand-in for a logfire span; attributes are dropped"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def set_attribute(self, key, value):
+        pass
+
+class _NoHistogram:
+    def record(self, amount, attributes=None):
+        pass
+
+class _NoLogfire:
+    """Stand-in for logfire when it is not configured"""
+    
+    def span(self, *args, **kwargs):
+        return _NoSpan()
+    
+    def metric_histogram(self, *args, **kwargs):
+        return _NoHistogram()
+
+# Configure Logfire (only imported when a token is set)
+logfire = _NoLogfire()
+if os.getenv("LOGFIRE_TOKEN"):
+    try:
+        import logfire as _logfire
+        _logfire.configure(service_name="update-tunnel", console=False)
+        logfire = _logfire
+    except Exception as e:
+        print(f"⚠️  Logfire configuration failed, continuing without it: {e}")
+
+_STEP_DURATION = logfire.metric_histogram("update_tunnel.step.duration_ms", unit="ms")
+
+CF_API = "https://api.cloudflare.com/client/v4"
+# Cloudflare responses worth retrying, with exponential backoff between attempts
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """A public hostname and the in-cluster service it forwards to"""
+    hostname: str
+    service: str
+
+# (hostname, service_ips key) pairs published through the tunnel
+_ROUTE_TEMPLATE = (
+    ("lucena.cloud", "grafana"),
+    ("alertmanager.lucena.cloud", "alertmanager"),
+    ("grafana.lucena.cloud", "grafana")
+)
+
+# Ingress rule that must close every tunnel config
+_CATCHALL = ({"service": "http_status:404"},)
+
+# Resolved tunnel IDs, keyed by "<account_id>/<tunnel_name>"
+CACHE_DIR = Path("~/.cache/update-tunnel").expanduser()
+TUNNEL_ID_CACHE = CACHE_DIR / "tunnel_id.json"
+# Last fetched config per tunnel ID with its ETag, for conditional GETs
+CONFIG_CACHE = CACHE_DIR / "config.json"
+
+def _read_cache(path):
+    """Read a JSON cache file, treating a missing or corrupt file as empty"""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _write_cache(path, data):
+    """Atomically replace a JSON cache file"""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"⚠️  Could not write cache {path}: {e}")
+
+def _load_tunnel_id(account_id, tunnel_name):
+    return _read_cache(TUNNEL_ID_CACHE).get(f"{account_id}/{tunnel_name}")
+
+def _store_tunnel_id(account_id, tunnel_name, tunnel_id):
+    cache = _read_cache(TUNNEL_ID_CACHE)
+    key = f"{account_id}/{tunnel_name}"
+    if tunnel_id is None:
+        cache.pop(key, None)
+    else:
+        cache[key] = tunnel_id
+    _write_cache(TUNNEL_ID_CACHE, cache)
+
+@contextmanager
+def _step(step):
+    """Trace one step of the update as a span and record its duration"""
+    started = time.perf_counter()
+    with logfire.span(f"cloudflare.update_tunnel.{step}") as span:
+        try:
+            yield span
+        finally:
+            _STEP_DURATION.record((time.perf_counter() - started) * 1000, {"step": step})
+
+def _annotate(span, response):
+    span.set_attribute("status_code", response.status_code)
+    span.set_attribute("bytes", len(response.content))
+    span.set_attribute("cf_ray", response.headers.get("cf-ray"))
+
+def _load_api_token():
+    """Return (token, source) from CF_API_TOKEN or the keyring, or (None, None)"""
+    token = os.environ.get("CF_API_TOKEN")
+    if token:
+        return token, "CF_API_TOKEN"
+    if keyring is not None:
+        try:
+            token = keyring.get_password("cloudflare", "api_token")
+        except Exception as e:
+            print(f"⚠️  Could not read keyring: {e}")
+        if token:
+            return token, "keyring"
+    return None, None
 
-def get_service_ips():
+async def _request(client, method, url, **kwargs):
+    """Send a Cloudflare API request, retrying throttled and 5xx responses"""
+    for attempt in range(MAX_RETRIES + 1):
+        response = await client.request(method, url, **kwargs)
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+async def get_service_ips():
     """Get current service IPs from Kubernetes"""
     try:
-        # Get Grafana service IP
-        grafana_ip = subprocess.check_output([
-            "kubectl", "get", "service", "prometheus-operator-grafana", 
-            "-n", "prometheus", "-o", "jsonpath={.spec.clusterIP}"
-        ]).decode().strip()
-        
-        grafana_port = subprocess.check_output([
-            "kubectl", "get", "service", "prometheus-operator-grafana", 
-            "-n", "prometheus", "-o", "jsonpath={.spec.ports[0].port}"
-        ]).decode().strip()
+        # Read both services in one kubectl call instead of one per field
+        with _step("get_service_ips"):
+            proc = await asyncio.create_subprocess_exec(
+                "kubectl", "get", "service", "prometheus-operator-grafana",
+                "prometheus-operator-kube-p-alertmanager",
+                "-n", "prometheus", "-o", "json",
+                stdout=asyncio.subprocess.PIPE
+            )
+            raw, _ = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"kubectl exited with status {proc.returncode}")
+        services = {item["metadata"]["name"]: item["spec"] for item in json.loads(raw)["items"]}
         
-        # Get Alertmanager service IP  
-        alertmanager_ip = subprocess.check_output([
-            "kubectl", "get", "service", "prometheus-operator-kube-p-alertmanager", 
-            "-n", "prometheus", "-o", "jsonpath={.spec.clusterIP}"
-        ]).decode().strip()
+        grafana = services["prometheus-operator-grafana"]
+        grafana_ip = grafana["clusterIP"]
+        grafana_port = grafana["ports"][0]["port"]
         
-        alertmanager_port = subprocess.check_output([
-            "kubectl", "get", "service", "prometheus-operator-kube-p-alertmanager", 
-            "-n", "prometheus", "-o", "jsonpath={.spec.ports[1].port}"
-        ]).decode().strip()
+        alertmanager = services["prometheus-operator-kube-p-alertmanager"]
+        alertmanager_ip = alertmanager["clusterIP"]
+        alertmanager_port = alertmanager["ports"][1]["port"]
         
         return {
             "grafana": f"{grafana_ip}:{grafana_port}",
@@ -40,56 +188,97 @@ def get_service_ips():
         }
     except Exception as e:
         print(f"❌ Error getting service IPs: {e}")
-        sys.exit(1)
+        return None
 
-def update_tunnel_routes(api_token, account_id, tunnel_name, routes):
-    """Update tunnel routes via Cloudflare API"""
-    headers = {
-        "Authorization": f"Bearer {api_token}",
-        "Content-Type": "application/json"
-    }
-    base_url = "https://api.cloudflare.com/client/v4"
+def _ingress_digest(ingress_rules):
+    """Hash the hostname rules of an ingress list, ignoring the catch-all rule"""
+    rules = [rule for rule in ingress_rules if "hostname" in rule]
+    payload = json.dumps(rules, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+async def _fetch_config(client, account_id, tunnel_id):
+    """GET a tunnel config, reusing the cached copy on 304 Not Modified; None if the tunnel is gone"""
+    cache = _read_cache(CONFIG_CACHE)
+    cached = cache.get(tunnel_id)
+    headers = {"If-None-Match": cached["etag"]} if cached else None
+    url = f"/accounts/{account_id}/cfd_tunnel/{tunnel_id}/configurations"
+    with _step("get_config") as span:
+        response = await _request(client, "GET", url, headers=headers)
+        _annotate(span, response)
+    if response.status_code == 404:
+        return None
+    if response.status_code == 304 and cached:
+        print("✅ Config not modified since last run, using cached copy")
+        return cached["config"]
+    response.raise_for_status()
     
+    config = response.json()["result"]
+    etag = response.headers.get("ETag")
+    if etag:
+        cache[tunnel_id] = {"etag": etag, "config": config}
+        _write_cache(CONFIG_CACHE, cache)
+    return config
+
+async def get_tunnel_config(client, account_id, tunnel_name):
+    """Resolve the tunnel and fetch its current config, returning (tunnel_id, config) or None"""
     try:
-        # Get tunnel
-        url = f"{base_url}/accounts/{account_id}/cfd_tunnel"
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        
-        tunnels = response.json()["result"]
-        tunnel = None
-        for t in tunnels:
-            if t["name"] == tunnel_name:
-                tunnel = t
-                break
-        
-        if not tunnel:
-            print(f"❌ Tunnel '{tunnel_name}' not found")
-            return False
+        # Resolve the tunnel ID only when it isn't cached
+        tunnel_id = _load_tunnel_id(account_id, tunnel_name)
+        current_config = None
+        if tunnel_id:
+            print(f"✅ Using cached ID for tunnel '{tunnel_name}': {tunnel_id}")
+            current_config = await _fetch_config(client, account_id, tunnel_id)
+            if current_config is None:
+                # Tunnel was recreated; forget the stale ID and look it up again
+                _store_tunnel_id(account_id, tunnel_name, None)
         
-        tunnel_id = tunnel["id"]
-        print(f"✅ Found tunnel '{tunnel_name}' with ID: {tunnel_id}")
-        
-        # Get current config
-        url = f"{base_url}/accounts/{account_id}/cfd_tunnel/{tunnel_id}/configurations"
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        current_config = response.json()["result"]
+        if current_config is None:
+            url = f"/accounts/{account_id}/cfd_tunnel"
+            with _step("list_tunnels") as span:
+                response = await _request(client, "GET", url)
+                _annotate(span, response)
+            response.raise_for_status()
+            
+            tunnels = response.json()["result"]
+            tunnel = next((t for t in tunnels if t["name"] == tunnel_name), None)
+            if not tunnel:
+                print(f"❌ Tunnel '{tunnel_name}' not found")
+                return None
+            
+            tunnel_id = tunnel["id"]
+            print(f"✅ Found tunnel '{tunnel_name}' with ID: {tunnel_id}")
+            _store_tunnel_id(account_id, tunnel_name, tunnel_id)
+            
+            current_config = await _fetch_config(client, account_id, tunnel_id)
+            if current_config is None:
+                print(f"❌ No configuration found for tunnel {tunnel_id}")
+                return None
         print(f"📋 Current config: {json.dumps(current_config, indent=2)}")
+        return tunnel_id, current_config
         
-        # Create new ingress rules matching the current format
-        ingress_rules = []
-        for route in routes:
-            rule = {
-                "service": route["service"],
-                "hostname": route["hostname"],
-                "originRequest": {}
-            }
-            ingress_rules.append(rule)
-            print(f"🔗 Added route: {route['hostname']} → {route['service']}")
+    except httpx.HTTPError as e:
+        print(f"❌ API Error: {e}")
+        return None
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return None
+
+async def update_tunnel_routes(client, account_id, tunnel_id, current_config, routes):
+    """Update tunnel routes via Cloudflare API"""
+    try:
+        # Create new ingress rules matching the current format, ending with the catch-all rule
+        ingress_rules = [
+            {"service": route.service, "hostname": route.hostname, "originRequest": {}}
+            for route in routes
+        ]
+        ingress_rules.extend(_CATCHALL)
+        print("\n".join(f"🔗 Added route: {route.hostname} → {route.service}" for route in routes))
         
-        # Add catch-all rule
-        ingress_rules.append({"service": "http_status:404"})
+        # Skip the PUT when the routes already match, so the config version isn't bumped for nothing
+        current_ingress = (current_config.get("config") or {}).get("ingress", [])
+        if _ingress_digest(ingress_rules) == _ingress_digest(current_ingress):
+            print("✅ No changes - skipping PUT")
+            return True
         
         # Create new config matching the current format
         new_config = {
@@ -100,8 +289,10 @@ def update_tunnel_routes(api_token, account_id, tunnel_name, routes):
         }
         
         # Update tunnel config
-        url = f"{base_url}/accounts/{account_id}/cfd_tunnel/{tunnel_id}/configurations"
-        response = requests.put(url, headers=headers, json=new_config)
+        url = f"/accounts/{account_id}/cfd_tunnel/{tunnel_id}/configurations"
+        with _step("put_config") as span:
+            response = await _request(client, "PUT", url, json=new_config)
+            _annotate(span, response)
         response.raise_for_status()
         result = response.json()["result"]
         
@@ -109,60 +300,68 @@ def update_tunnel_routes(api_token, account_id, tunnel_name, routes):
         print(f"📊 New config version: {result.get('config', {}).get('version', 'unknown')}")
         return True
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         print(f"❌ API Error: {e}")
         return False
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
 
-def main():
+async def main():
     """Main function - ONE SCRIPT TO RULE THEM ALL"""
     print("🔧 Cloudflare Tunnel Route Updater")
     print("=" * 40)
     
     # Configuration
-    API_TOKEN = "tP3kBAHW393AZzcZbnW5pdlIj5tWHf9kkcuO8OnN"
+    API_TOKEN, token_source = _load_api_token()
+    if not API_TOKEN:
+        print("❌ No Cloudflare API token: set CF_API_TOKEN or store it in the keyring")
+        sys.exit(1)
+    print(f"🔑 Using Cloudflare API token from {token_source}")
     ACCOUNT_ID = "a2862058e1cc276aa01de068d23f6e1f"
     TUNNEL_NAME = "homelab"
     
-    # Get current service IPs
-    print("📡 Getting current service IPs...")
-    service_ips = get_service_ips()
-    print(f"   • Grafana: {service_ips['grafana']}")
-    print(f"   • Alertmanager: {service_ips['alertmanager']}")
-    
-    # Create routes with current IPs
-    routes = [
-        {
-            "hostname": "lucena.cloud",
-            "service": f"http://{service_ips['grafana']}",
-            "path": "*"
-        },
-        {
-            "hostname": "alertmanager.lucena.cloud", 
-            "service": f"http://{service_ips['alertmanager']}",
-            "path": "*"
-        },
-        {
-            "hostname": "grafana.lucena.cloud",
-            "service": f"http://{service_ips['grafana']}",
-            "path": "*"
-        }
-    ]
-    
-    # Update routes
-    success = update_tunnel_routes(API_TOKEN, ACCOUNT_ID, TUNNEL_NAME, routes)
+    headers = {
+        "Authorization": f"Bearer {API_TOKEN}",
+        "Content-Type": "application/json"
+    }
+    async with httpx.AsyncClient(
+        base_url=CF_API,
+        headers=headers,
+        timeout=30.0,
+        transport=httpx.AsyncHTTPTransport(retries=MAX_RETRIES)
+    ) as client:
+        # kubectl and the Cloudflare config lookup are independent, so run them side by side
+        print("📡 Getting current service IPs...")
+        service_ips, tunnel = await asyncio.gather(
+            get_service_ips(),
+            get_tunnel_config(client, ACCOUNT_ID, TUNNEL_NAME)
+        )
+        if service_ips is None:
+            sys.exit(1)
+        print(f"   • Grafana: {service_ips['grafana']}")
+        print(f"   • Alertmanager: {service_ips['alertmanager']}")
+        
+        # Create routes with current IPs
+        routes = tuple(
+            Route(hostname, f"http://{service_ips[service]}")
+            for hostname, service in _ROUTE_TEMPLATE
+        )
+        
+        # Update routes
+        success = tunnel is not None and await update_tunnel_routes(
+            client, ACCOUNT_ID, *tunnel, routes
+        )
     
     if success:
         print("\n🎉 Tunnel routes updated successfully!")
         print("📋 Updated routes:")
         for route in routes:
-            print(f"   • {route['hostname']} → {route['service']}")
+            print(f"   • {route.hostname} → {route.service}")
     else:
         print("\n❌ Failed to update tunnel routes")
         print("💡 You may need to update routes manually in Cloudflare dashboard")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())